@@ -1,75 +1,269 @@
 
-import heapq
-import dhg 
+import hashlib
 import itertools
 import random
-import copy
 import numpy as np 
+from hypergraph_incidence import Incidence, component_stats
+from hypergraph_sampler import SubgraphSampler, parallel_sample_batch
+import hypergraph_isomorphism
+import hypergraph_wl
 _NUMBER_OF_NODES_RANGE = {
     "small": np.arange(5, 10),
     "medium": np.arange(10, 15),
     "large": np.arange(15, 20),
 }
-import copy
 
-class HyperGraph(dhg.Hypergraph):
-    def __init__(self,vertices,edges) -> None:
-        super().__init__(len(vertices),edges)
-        self.vertices = vertices
-        self.hyperedges = edges
-        self.data = {'vertex':vertices,'hypedges':edges}
-        pass
+# above this size distance() runs a bidirectional BFS per query instead of caching the all-pairs matrix
+_MAX_DISTANCE_MATRIX_VERTICES = 2048
+
+
+def bfs_path(vertex_edges,hyperedges,source,target):
+    """
+    Unit-weight shortest path, stops as soon as target is reached.
+    Each level is expanded in increasing vertex order and each vertex keeps the first (vertex, hyperedge)
+    that reached it, which is the path the heap based Dijkstra returned.
+    return: [(vertex, hyperedge to the next vertex), ..., (target, -1)] or None
+    """
+    previous = {source: None}
+    frontier = [source]
+    while frontier and target not in previous:
+        next_frontier = []
+        for current_vertex in sorted(frontier):
+            for i in vertex_edges.get(current_vertex,()):
+                for vertex in hyperedges[i]:
+                    if vertex not in previous:
+                        previous[vertex] = (current_vertex,i)
+                        next_frontier.append(vertex)
+            if target in previous:
+                break
+        frontier = next_frontier
+    if target not in previous:
+        return None
+    path = []
+    current_vertex = (target,-1)
+    while current_vertex is not None:
+        path.append(current_vertex)
+        current_vertex = previous[current_vertex[0]]
+    return path[::-1]
+
+
+def bfs_distance(neighbors,source,target):
+    """
+    Bidirectional breadth-first search, always growing the smaller frontier by one full level.
+    neighbors: callable returning the neighbors of a vertex
+    return: hop distance between source and target, None if they are not connected
+    """
+    if source == target:
+        return 0
+    depth = [{source: 0},{target: 0}]
+    frontiers = [[source],[target]]
+    while frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        seen,other = depth[side],depth[1 - side]
+        best = None
+        next_frontier = []
+        for current_vertex in frontiers[side]:
+            d = seen[current_vertex] + 1
+            for vertex in neighbors(current_vertex):
+                if vertex in other:
+                    if best is None or d + other[vertex] < best:
+                        best = d + other[vertex]
+                elif vertex not in seen:
+                    seen[vertex] = d
+                    next_frontier.append(vertex)
+        if best is not None:
+            return best
+        frontiers[side] = next_frontier
+    return None
+
+
+def content_hash(num_v,edges):
+    """
+    sha1 hex digest of the number of vertices and the hyperedges in their order (not invariant under relabelling)
+    """
+    return hashlib.sha1(repr((num_v,[tuple(e) for e in edges])).encode()).hexdigest()
+
+
+def vertex_positions(vertices):
+    """
+    None if the vertex ids are exactly 0..n-1 (in any order), which the incidence structure indexes directly,
+    else the vertex id -> position dict used to index it
+    """
+    if type(vertices) is range and vertices.start == 0 and vertices.step == 1:
+        return None
+    positions = {v:i for i,v in enumerate(vertices)}
+    if len(positions) == len(vertices) and all(i in positions for i in range(len(vertices))):
+        return None
+    return positions
+
+
+def batch_has_path(graphs,sources,targets):
+    """
+    Reachability of (sources[i], targets[i]) in graphs[i] for a whole list of graphs in one vectorized pass
+    return: boolean array
+    """
+    labels = [graph.components() for graph in graphs]
+    offsets = np.zeros(len(labels),dtype=np.int64)
+    np.cumsum([len(l) for l in labels[:-1]],out=offsets[1:])
+    labels = np.concatenate(labels) if labels else np.zeros(0,dtype=np.int32)
+    sources = offsets + np.asarray([g.position(s) for g,s in zip(graphs,sources)],dtype=np.int64)
+    targets = offsets + np.asarray([g.position(t) for g,t in zip(graphs,targets)],dtype=np.int64)
+    return labels[sources] == labels[targets]
+
+
+class CliqueExpansion:
+    """
+    Clique expansions of a hypergraph.
+    edges: [a, b, hyperedge index] for every vertex pair of every hyperedge (high-order expansion)
+    edges_low: the distinct (a, b) pairs (low-order expansion)
+    """
+    def __init__(self,num_v,edges):
+        self.num_v = num_v
+        self.edges = edges
+        low = set()
+        high_neighbors = {}
+        for a,b,i in edges:
+            low.add((a,b))
+            high_neighbors.setdefault(a,[]).append((b,i))
+            if a != b:
+                high_neighbors.setdefault(b,[]).append((a,i))
+        self.edges_low = list(low)
+        self._high_neighbors = high_neighbors
+        self._low_neighbors = {
+            v:sorted({u for u,_ in pairs} - {v}) for v,pairs in high_neighbors.items()
+        }
+        self._adjacency = None
+
+    def neighbor(self,source_vertex):
+        """
+        (neighbor, hyperedge index) pairs of the vertex in the high-order expansion
+        """
+        return list(self._high_neighbors.get(source_vertex,[]))
+
+    def neighbor_low(self,source_vertex):
+        """
+        sorted neighbors of the vertex in the low-order expansion
+        """
+        return list(self._low_neighbors.get(source_vertex,[]))
+
+    def adjacency(self):
+        """
+        scipy.sparse CSR adjacency matrix of the low-order expansion (symmetric, no self loops)
+        """
+        if self._adjacency is None:
+            import scipy.sparse
+            pairs = np.array([p for p in self.edges_low if p[0] != p[1]],dtype=np.int64).reshape(-1,2)
+            rows = np.concatenate([pairs[:,0],pairs[:,1]])
+            cols = np.concatenate([pairs[:,1],pairs[:,0]])
+            self._adjacency = scipy.sparse.csr_matrix(
+                (np.ones(len(rows),dtype=np.int8),(rows,cols)),shape=(self.num_v,self.num_v)
+            )
+        return self._adjacency
+
+
+class _HyperGraphQueries:
+    """
+    Queries shared by HyperGraph and LiteHyperGraph, built on vertices, hyperedges, v and e
+    """
+    __slots__ = ()
+
+    def _reset_index(self):
+        """
+        Drop every structure derived from the hyperedges, they are rebuilt on next use
+        """
+        self._vertex_edges = None
+        self._vertex_neighbors = None
+        self._distances = None
+        self._components = None
+        self._clique = None
+        self._sampler = None
+        self._certificate = None
+        self._wl_fingerprint = None
+        self._content_hash = None
+        self._incidence = None
+        if self.compact:
+            self.incidence()
+
+    def incidence(self):
+        """
+        return the compressed incidence structure of the hypergraph, built on first use.
+        It is indexed by vertex position (see position), which is the vertex id itself when the ids are 0..n-1.
+        Building it does not switch a non-compact graph to the compact query path, which is chosen by self.compact only
+        """
+        if self._incidence is None:
+            self._positions = vertex_positions(self.vertices)
+            edges = self.hyperedges
+            if self._positions is not None:
+                edges = [[self._positions[v] for v in e] for e in edges]
+            self._incidence = Incidence.from_edges(len(self.vertices),edges)
+        return self._incidence
+
+    def position(self,vertex):
+        """
+        Index of a vertex in the incidence structure, components() and distances()
+        """
+        self.incidence()
+        return vertex if self._positions is None else self._positions[vertex]
+
+    def _vertex_ids(self,positions):
+        """
+        Vertex ids of a sequence of incidence positions
+        """
+        positions = list(positions)
+        if self._positions is None:
+            return positions
+        return [self.vertices[p] for p in positions]
+
+    def _build_index(self):
+        """
+        Build the vertex -> incident hyperedges and vertex -> neighbors index in one pass over the hyperedges
+        """
+        vertex_edges = {}
+        vertex_neighbors = {}
+        for i,e in enumerate(self.hyperedges):
+            edge_set = set(e)
+            for vertex in e:
+                incident = vertex_edges.setdefault(vertex,[])
+                if not incident or incident[-1] != i:
+                    incident.append(i)
+                vertex_neighbors.setdefault(vertex,set()).update(edge_set)
+        for vertex,vertex_set in vertex_neighbors.items():
+            vertex_set.discard(vertex)
+            vertex_neighbors[vertex] = list(vertex_set)
+        self._vertex_edges = vertex_edges
+        self._vertex_neighbors = vertex_neighbors
 
     def __getitem__(self, key):
         return self.data[key]
     
-    def sample_graph(self):
+    def sampler(self):
+        """
+        Neighborhood sampler over the incidence index of this (large) hypergraph, built on first use
+        """
+        if self._sampler is None:
+            self._sampler = SubgraphSampler(self.incidence(),_NUMBER_OF_NODES_RANGE)
+        return self._sampler
+
+    def sample_graph(self,seed=None):
         """
         sample graphs from real dataset.
+        seed: seed of the sample's random stream, drawn from the global random module if None
+        """
+        if seed is None:
+            seed = random.getrandbits(64)
+        num_v,edge_list = self.sampler().sample(np.random.default_rng(seed))
+        return type(self)(range(num_v),edge_list)
+
+    def sample_graphs(self,number_of_samples,seed,processes=1):
+        """
+        sample a batch of graphs, each from its own random stream spawned from seed
+        processes: number of worker processes (None for all cores); the samples do not depend on it
         """
-        graph_sizes = random.choices(
-            list(_NUMBER_OF_NODES_RANGE.keys())
-        )
-        number_of_vertices = random.choice(_NUMBER_OF_NODES_RANGE[graph_sizes[0]])
-        number_of_vertices = min(number_of_vertices,len(self.vertices))
-        vertex_list = set()
-        while len(vertex_list) < number_of_vertices:
-            center = random.choice(self.vertices)
-            queue = []
-            queue.append(center)
-            while len(queue) != 0  and len(vertex_list) < number_of_vertices: 
-                neibor_list = set()
-                while len(queue) != 0:
-                    n = queue.pop(0)
-                    tmp = self.neighbor(n)
-                    resume_num = max(1,int(random.random() * number_of_vertices*0.5 )) 
-                    if len(tmp) >  int(resume_num):
-                        tmp = random.sample(tmp,k=int(resume_num))
-                    neibor_list.update(set(tmp))
-                
-                if len(neibor_list) >  int(1/2 *number_of_vertices):
-                    neibor_list = random.sample(neibor_list,k=int(1/2 *number_of_vertices))   
-                vertex_list.update(set(neibor_list))
-                queue.extend(list(set(neibor_list)-vertex_list))
-        vertex_list = list(vertex_list)
-        vertex_list = vertex_list[:number_of_vertices]
-        vertex_list = sorted(vertex_list)
-        reorder_dict = {}
-        for i,n in  enumerate(vertex_list):
-            reorder_dict[n] = i
-        edge_set = set()
-        edges = copy.deepcopy(self.hyperedges)
-        for e in edges:
-            com_e = set(e).intersection(set(vertex_list))
-            if len(com_e) > 1:
-                com_e = [reorder_dict[i] for i in com_e]
-                com_e = tuple(sorted(com_e))
-                if com_e not in edge_set:
-                    edge_set.add(com_e)
-        edge_list = sorted(list(edge_set),key= lambda x: x[0])
-        if len(edge_list) == 0:
-            return self.sample_graph()
-        return HyperGraph(range(len(vertex_list)),edge_list)
+        if processes == 1:
+            samples = self.sampler().sample_batch(number_of_samples,seed)
+        else:
+            samples = parallel_sample_batch(self.incidence(),_NUMBER_OF_NODES_RANGE,number_of_samples,seed,processes=processes)
+        return [type(self)(range(num_v),edge_list) for num_v,edge_list in samples]
         
         
 
@@ -77,55 +271,134 @@ class HyperGraph(dhg.Hypergraph):
         """
         return neighborhood 
         """
-        vertex_set = set()
-        for e in self.hyperedges:
-            if source in e:
-                vertex_set.update(set(e))
-        if source in vertex_set:
-            vertex_set.remove(source)
-        return list(vertex_set)
+        if self.compact:
+            return self._vertex_ids(self.incidence().neighbor(self.position(source)).tolist())
+        if self._vertex_neighbors is None:
+            self._build_index()
+        return list(self._vertex_neighbors.get(source,[]))
 
 
 
-    def shuffleNode(self):
+    def permute(self,perm):
+        """
+        Isomorphic copy of the hypergraph with every vertex v renamed to perm[v]
+        (perm[position(v)] for vertex ids other than 0..n-1, the copy always has the ids 0..n-1)
+        """
+        return type(self)(self.v,self.incidence().permuted_edges(perm))
+
+    def shuffleNode(self,return_perm=False,rng=None):
         """
         Randomly shuffle the vertices of the hypergraph for hypergraph isomorphism problems
+        return_perm: also return the permutation (vertex v of self is vertex perm[v] of the copy)
+        rng: random.Random to draw from, the random module if None
+        """
+        perm = list(self.v)
+        (rng or random).shuffle(perm)
+        perm = np.asarray(perm,dtype=np.int64)
+        graph = self.permute(perm)
+        if return_perm:
+            return graph,perm
+        return graph
+
+    def shuffle_batch(self,k,seed=None):
+        """
+        k randomly relabelled isomorphic copies computed in one vectorized pass
+        return: list of (graph, perm) pairs
+        """
+        rng = np.random.default_rng(seed)
+        perms = rng.permuted(np.tile(np.arange(len(self.v)),(k,1)),axis=1)
+        edges = self.incidence().permuted_edges(perms)
+        return [(type(self)(self.v,e),perm) for e,perm in zip(edges,perms)]
+
+    def is_permutation_of(self,other,perm):
+        """
+        Whether perm maps the hyperedges of self exactly onto the hyperedges of other
+        """
+        perm = np.asarray(perm)
+        mapped = {tuple(sorted(perm[[self.position(v) for v in e]].tolist())) for e in self.e[0]}
+        return len(self.e[0]) == len(other.e[0]) and mapped == {tuple(sorted(e)) for e in other.e[0]}
+
+    def canonical_form(self):
+        """
+        (number of vertices, hyperedges under the canonical labelling), identical for isomorphic hypergraphs
+        """
+        return hypergraph_isomorphism.canonical_form(len(self.v),self.e[0])
+
+    def certificate(self):
+        """
+        Hash of the canonical form, cached: two hypergraphs are isomorphic iff their certificates are equal
         """
-        verts = copy.deepcopy(self.v)
-        random.shuffle(verts)
-        hyperedges = []
-        for edge in self.e[0]:
-            tmp = []
-            for n in edge:
-                tmp.append(verts[n])
-            sorted(tmp,key=int)
-            hyperedges.append(tmp)
-        return HyperGraph(self.v,hyperedges)
+        if self._certificate is None:
+            self._certificate = hypergraph_isomorphism.certificate(len(self.v),self.e[0])
+        return self._certificate
+
+    def content_hash(self):
+        """
+        Hash of the number of vertices and the ordered hyperedges, cached: equal for graphs with the same text encodings
+        """
+        if self._content_hash is None:
+            self._content_hash = content_hash(len(self.v),self.e[0])
+        return self._content_hash
+
+    def wl_fingerprint(self):
+        """
+        Weisfeiler-Lehman colour histogram hash, cached: different fingerprints mean the hypergraphs are not isomorphic
+        """
+        return hypergraph_wl.wl_fingerprints([self])[0]
+
+    def is_isomorphic(self,other):
+        if self.wl_fingerprint() != other.wl_fingerprint():
+            return False
+        return self.certificate() == other.certificate()
 
     def keys(self):
         return self.data.keys()
     
+    def components(self):
+        """
+        Connected component label of every vertex position (int32 array), built once by union-find
+        """
+        if self._components is None:
+            self._components = self.incidence().component_labels()
+        return self._components
+
+    def component_stats(self):
+        """
+        Number of components, largest component, isolated vertices and the sorted component sizes
+        """
+        return component_stats(self.components())
+
     def has_path(self,source,target):
         """
         Whether there is a path between two vertices of the hypergraph, used for reachability tasks
         """
-        path = self.short_path(source,target)
-        if path is not None:
-            return True 
-        return False 
+        labels = self.components()
+        return bool(labels[self.position(source)] == labels[self.position(target)])
+
+    def clique(self):
+        """
+        Both clique expansions of the hypergraph, computed once and shared by every encoder and task
+        """
+        if self._clique is None:
+            if self.compact:
+                edges = self.incidence().clique_expanation().tolist()
+                if self._positions is not None:
+                    edges = [sorted(self._vertex_ids((a,b))) + [i] for a,b,i in edges]
+            else:
+                edges = []
+                for i,e in enumerate(self.e[0]):
+                    for low_e in itertools.combinations(e, 2):
+                        low_e = sorted(low_e)
+                        low_e.append(i)
+                        edges.append(low_e)
+            self._clique = CliqueExpansion(len(self.v),edges)
+        return self._clique
 
     def clique_expanation(self):
         """
         Clique expansion of the hypergraph (preserving edge information, vertex a and vertex b are connected through hyperedges), used for hypergraph textualization clique_low_order_inc
         """
-        hyperedges = self.e[0]
-        edges = []
-        for i,e in enumerate(hyperedges):
-            for low_e in list(itertools.combinations(e, 2)):
-                low_e = sorted(low_e)
-                low_e.append(i)
-                edges.append(low_e)
-        edges = list(edges)
+        edges = self.clique().edges
         self.clique_v = len(self.v)
         self.clique_e = edges
         return len(self.v) , edges
@@ -135,14 +408,7 @@ class HyperGraph(dhg.Hypergraph):
         """
         Low-order clique extension of the hypergraph (no edge information is preserved, vertex a is connected to vertex b), used for hypergraph textualization clique_adj and clique_inc
         """
-        hyperedges = self.e[0]
-        edges = set()
-        for i,e in enumerate(hyperedges):
-            for low_e in list(itertools.combinations(e, 2)):
-                low_e = sorted(low_e)
-                if tuple(sorted(low_e)) not in edges:
-                    edges.add(tuple(sorted(low_e)))
-        edges = list(edges)
+        edges = self.clique().edges_low
         self.clique_v = len(self.v)
         self.clique_e = edges
         return len(self.v) , edges
@@ -153,84 +419,183 @@ class HyperGraph(dhg.Hypergraph):
         Shortest path algorithm for hypergraphs
         return: shortest path
         """
-        queue = [(0,source)]
-        distances = {vertex: float('inf') for vertex in self.vertices}
-        previous_vertices = {vertex: None for vertex in self.vertices}
-
-        distances[source] = 0
-        while queue:
-            current_distance, current_vertex = heapq.heappop(queue)
-            if current_vertex == target:
-                path = []
-                current_vertex = (current_vertex,-1)
-                while current_vertex is not None:
-                    path.append(current_vertex)
-                    current_vertex = previous_vertices[current_vertex[0]]
-                return path[::-1]
-            if current_distance > distances[current_vertex]:
-                continue
-            connected_edges = self.edges(current_vertex)
-            connected_edges_list = [self.hyperedges[i] for i in connected_edges]
-            for i,edges in enumerate(connected_edges_list):
-                for vertex in edges:
-                    distance = current_distance + 1
-                    if distance < distances[vertex]:
-                        distances [vertex] = distance
-                        previous_vertices[vertex] = (current_vertex,connected_edges[i])
-                        heapq.heappush(queue, (distance, vertex))
-        return None
+        if self.compact:
+            path = self.incidence().short_path(self.position(source),self.position(target))
+            if path is None or self._positions is None:
+                return path
+            return [(self.vertices[p],i) for p,i in path]
+        if self._vertex_edges is None:
+            self._build_index()
+        return bfs_path(self._vertex_edges,self.hyperedges,source,target)
+
+    def distances(self):
+        """
+        All-pairs hop distance matrix over vertex positions (-1 for unreachable pairs), computed once and cached until the hyperedges change
+        """
+        if self._distances is None:
+            self._distances = self.incidence().distance_matrix()
+        return self._distances
+
+    def distance(self,source,target):
+        """
+        Number of hops on the shortest path between two vertices, None if they are not connected
+        """
+        if len(self.vertices) <= _MAX_DISTANCE_MATRIX_VERTICES:
+            d = self.distances()[self.position(source),self.position(target)]
+            return None if d < 0 else int(d)
+        if self.compact:
+            incidence = self.incidence()
+            return bfs_distance(lambda v: incidence.neighbor(v).tolist(),self.position(source),self.position(target))
+        if self._vertex_neighbors is None:
+            self._build_index()
+        return bfs_distance(lambda v: self._vertex_neighbors.get(v,()),source,target)
 
     def clique_neighbor(self,source_vertex):
         "Find the neighbor points corresponding to the source vertex after the higher-order clique expansion"
-        if not hasattr(self,'clique_e'):
-            self.clique_expanation()
-        tmp = []
-        for i,edge in enumerate(self.clique_e):
-            assert len(edge) == 3
-            if source_vertex in edge:
-                if source_vertex==edge[0]:
-                    tmp.append((edge[1],edge[2]))
-                elif source_vertex == edge[1]:
-                    tmp.append((edge[0],edge[2]))
-        try:
-            tmp.remove(source_vertex)
-        except:
-            pass
-        return tmp
+        return self.clique().neighbor(source_vertex)
     
 
     def clique_neighbor_low(self,source_vertex):
         "Find the neighbor points corresponding to the source vertex after the low-order clique expansion"
-        if not hasattr(self,'clique_e'):
-            self.clique_expanation_low()
-        tmp = []
-        for i,edge in enumerate(self.clique_e):
-            assert len(edge) == 2
-            if source_vertex in edge:
-                if source_vertex==edge[0]:
-                    tmp.append(edge[1])
-                elif source_vertex == edge[1]:
-                    tmp.append(edge[0])
-        tmp =  sorted(list(set(tmp)))
-        try:
-            tmp.remove(source_vertex)
-        except:
-            pass
-        return tmp
+        return self.clique().neighbor_low(source_vertex)
 
     def edges(self,vertex):
         """
         return the hyperedge indices contain the vertex 
         """
-        tmp = []
-        for i,edge in enumerate(self.hyperedges):
-            if vertex in edge:
-                tmp.append(i)
-        return tmp 
-    
-    
+        if self.compact:
+            return self.incidence().edges(self.position(vertex)).tolist()
+        if self._vertex_edges is None:
+            self._build_index()
+        return list(self._vertex_edges.get(vertex,[]))
+
+    def degree(self,vertex):
+        """
+        return the number of hyperedges contain the vertex
+        """
+        if self.compact:
+            return self.incidence().degree(self.position(vertex))
+        return len(self.edges(vertex))
+
+
+def _format_edges(edges):
+    """
+    Sort every hyperedge into a tuple in place and drop repeated hyperedges, as dhg.Hypergraph does
+    """
+    if type(edges) is not list:
+        edges = list(edges)
+    for i in range(len(edges)):
+        edges[i] = tuple(sorted(edges[i]))
+    return list(dict.fromkeys(edges))
+
+
+class LiteHyperGraph(_HyperGraphQueries):
+    """
+    HyperGraph without the dhg/torch structures: the hyperedges are stored once and the same queries are
+    answered from the shared indexes. The dhg.Hypergraph is only built when H (or to_dhg) is asked for.
+    Assigning vertices or hyperedges drops every structure built from them, like dhg does after a modification.
+    """
+    __slots__ = (
+        '_vertices','_hyperedges','compact','clique_v','clique_e','_dhg','_v','_e',
+        '_vertex_edges','_vertex_neighbors','_distances','_components','_clique',
+        '_sampler','_certificate','_wl_fingerprint','_content_hash','_incidence','_positions',
+    )
+
+    def __init__(self,vertices,edges,compact=False) -> None:
+        self.compact = compact
+        self._vertices = vertices
+        self.hyperedges = edges
+
+    def __getstate__(self):
+        return self.vertices,self.hyperedges,self.compact
+
+    def __setstate__(self,state):
+        self.__init__(*state)
+
+    def _reset_index(self):
+        self._dhg = None
+        self._v = None
+        self._e = None
+        super()._reset_index()
+
+    @property
+    def vertices(self):
+        return self._vertices
+
+    @vertices.setter
+    def vertices(self,vertices):
+        self._vertices = vertices
+        self._reset_index()
+
+    @property
+    def hyperedges(self):
+        return self._hyperedges
+
+    @hyperedges.setter
+    def hyperedges(self,edges):
+        """
+        sorts every hyperedge and drops repeated ones, as dhg.Hypergraph does
+        """
+        self._hyperedges = _format_edges(edges)
+        self._reset_index()
+
+    @property
+    def num_v(self):
+        return len(self._vertices)
+
+    @property
+    def num_e(self):
+        return len(self._hyperedges)
+
+    @property
+    def v(self):
+        """
+        list of the vertex indices, built once
+        """
+        if self._v is None:
+            self._v = list(range(len(self._vertices)))
+        return self._v
+
+    @property
+    def e(self):
+        """
+        (hyperedges, weights) like dhg.Hypergraph.e, every weight is 1.0; built once
+        """
+        if self._e is None:
+            self._e = self._hyperedges,[1.0] * len(self._hyperedges)
+        return self._e
+
+    @property
+    def data(self):
+        return {'vertex':self.vertices,'hypedges':self.hyperedges}
+
+    def to_dhg(self):
+        """
+        return the equivalent dhg.Hypergraph, built on first use
+        """
+        if self._dhg is None:
+            import dhg
+            self._dhg = dhg.Hypergraph(len(self.vertices),list(self.hyperedges))
+        return self._dhg
+
+    @property
+    def H(self):
+        return self.to_dhg().H
+
+
+def __getattr__(name):
+    """
+    HyperGraph subclasses dhg.Hypergraph: it is defined in hypergraph_dhg, and dhg (with torch) imported,
+    only when it is first used, so that LiteHyperGraph users start without them
+    """
+    if name == 'HyperGraph':
+        from hypergraph_dhg import HyperGraph
+        return HyperGraph
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 if __name__ == "__main__":
     vertices = [1,2,3,4,5]
     edges = [[1,2],[2,3,4],[4,5]]
-    hypergraph = HyperGraph(vertices,edges)
-    hypergraph.has_path(1,5)
\ No newline at end of file
+    hypergraph = LiteHyperGraph(vertices,edges)
+    print(hypergraph.has_path(1,5),hypergraph.distance(1,5),hypergraph.short_path(1,5))
\ No newline at end of file
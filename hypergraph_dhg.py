@@ -0,0 +1,33 @@
+import dhg
+
+from hyper_graph import _HyperGraphQueries
+
+
+class HyperGraph(_HyperGraphQueries,dhg.Hypergraph):
+    def __init__(self,vertices,edges,compact=False) -> None:
+        """
+        compact: build the NumPy CSR/CSC incidence structure up front and answer edges, neighbor, degree,
+        clique expansion and short_path queries from it (neighbor lists are then returned sorted)
+        """
+        super().__init__(len(vertices),edges)
+        self.vertices = vertices
+        # dhg has sorted the hyperedges and merged repeated ones, index the same list as e[0]
+        self.hyperedges = list(self.e[0])
+        self.data = {'vertex':vertices,'hypedges':self.hyperedges}
+        self.compact = compact
+        self._reset_index()
+        pass
+
+    def _clear_cache(self, group_name=None):
+        """
+        dhg calls this after every modification of the hyperedges (add_hyperedges, remove_hyperedges, ...)
+        """
+        super()._clear_cache(group_name)
+        if getattr(self,'hyperedges',None) is not None:
+            self.hyperedges = list(self.e[0])
+            self.data['hypedges'] = self.hyperedges
+            self._reset_index()
+
+
+# pickles refer to hyper_graph.HyperGraph, which resolves here through hyper_graph.__getattr__
+HyperGraph.__module__ = 'hyper_graph'
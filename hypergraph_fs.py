@@ -0,0 +1,72 @@
+import builtins
+import os
+
+
+def is_remote(path):
+    """
+    Whether the path is a URI (gs://, s3://, hdfs://, ...) that needs tensorflow's gfile
+    """
+    path = os.fspath(path)
+    return '://' in path and not path.startswith('file://')
+
+
+def _local(path):
+    path = os.fspath(path)
+    return path[len('file://'):] if path.startswith('file://') else path
+
+
+def _gfile():
+    """
+    tensorflow is only imported for remote paths, it dominates the startup time otherwise
+    """
+    from tensorflow.io import gfile
+    return gfile
+
+
+def listdir(path):
+    if is_remote(path):
+        return _gfile().listdir(path)
+    return os.listdir(_local(path))
+
+
+def exists(path):
+    if is_remote(path):
+        return _gfile().exists(path)
+    return os.path.exists(_local(path))
+
+
+def makedirs(path):
+    """
+    Create the directory and its parents, nothing happens if it already exists
+    """
+    if is_remote(path):
+        _gfile().makedirs(path)
+    else:
+        os.makedirs(_local(path), exist_ok=True)
+
+
+def rename(source, target):
+    """
+    Move source to target, replacing target if it exists
+    """
+    if is_remote(source):
+        _gfile().rename(source, target, overwrite=True)
+    else:
+        os.replace(_local(source), _local(target))
+
+
+def map_bytes(path):
+    """
+    Read-only uint8 array of the file contents: an np.memmap for local files, read once for remote ones
+    """
+    import numpy as np
+    if is_remote(path):
+        with _gfile().GFile(path, 'rb') as f:
+            return np.frombuffer(f.read(), dtype=np.uint8)
+    return np.memmap(_local(path), dtype=np.uint8, mode='r')
+
+
+def open(path, mode='r'):
+    if is_remote(path):
+        return _gfile().GFile(path, mode)
+    return builtins.open(_local(path), mode)
@@ -20,8 +20,11 @@ import os
 
 from absl import app
 from absl import flags
+from absl import logging
 import networkx as nx
-from tensorflow.io import gfile
+import hypergraph_fs
+import hypergraph_profile
+import hypergraph_store
 # from hyper_graph import HyperGraph
 # from graphqa import graph_generator_utils
 import hypergraph_generator_utils
@@ -60,20 +63,39 @@ _SPLIT = flags.DEFINE_string(
 )
 _MIN_SPARSITY = flags.DEFINE_float("min_sparsity", 0.0, "The minimum sparsity.")
 _MAX_SPARSITY = flags.DEFINE_float("max_sparsity", 1.0, "The maximum sparsity.")
+_MAX_COMPONENTS = flags.DEFINE_integer(
+    "max_components", 0,
+    "Redraw hypergraphs with more connected components than this (0 keeps every draw)."
+)
+_GRAPH_FORMAT = flags.DEFINE_enum(
+    "graph_format", "store", ["store", "pkl"],
+    "store writes the split as one columnar graphs.hgs file, pkl one pickle per graph."
+)
+_PROFILE_STARTUP = flags.DEFINE_bool(
+    "profile_startup", False, "Print the import time of every module this script loads."
+)
 
 import dhg 
-def write_graphs(graphs, output_dir):
+def write_graphs(graphs, output_dir, algorithm="", split=""):
   """Writes graphs to output_dir."""
-  if not gfile.exists(output_dir):
-    gfile.makedirs(output_dir)
-  if isinstance(graphs[0],dict) or isinstance(graphs[0],dhg.structure.Hypergraph):
+  if not hypergraph_fs.exists(output_dir):
+    hypergraph_fs.makedirs(output_dir)
+  is_hypergraph = isinstance(graphs[0],dict) or isinstance(graphs[0],dhg.structure.Hypergraph)
+  if is_hypergraph and _GRAPH_FORMAT.value == "store":
+    hypergraph_store.write_store(
+        graphs,
+        os.path.join(output_dir, hypergraph_store.STORE_FILE_NAME),
+        algorithm=algorithm,
+        split=split,
+    )
+  elif is_hypergraph:
     for ind, graph in enumerate(graphs):
       hypergraph_generator_utils.write_graph_pkl(graph,os.path.join(output_dir, str(ind) + ".pkl"))
   else:
     for ind, graph in enumerate(graphs):
       nx.write_graphml(
           graph,
-          open(
+          hypergraph_fs.open(
               os.path.join(output_dir, str(ind) + ".graphml"),
               "wb",
           ),
@@ -83,6 +105,8 @@ def write_graphs(graphs, output_dir):
 def main(argv):
   if len(argv) > 1:
     raise app.UsageError("Too many command-line arguments.")
+  if _PROFILE_STARTUP.value:
+    print(hypergraph_profile.startup_report("hypergraph_generator", os.path.dirname(os.path.abspath(__file__))))
 
   if _SPLIT.value == "train":
     random_seed = 9876
@@ -100,7 +124,17 @@ def main(argv):
       random_seed=random_seed,
       er_min_sparsity=_MIN_SPARSITY.value,
       er_max_sparsity=_MAX_SPARSITY.value,
+      max_components=_MAX_COMPONENTS.value,
   )
+  if isinstance(generated_graphs[0], dhg.structure.Hypergraph):
+    stats = [hypergraph_generator_utils.component_stats(g) for g in generated_graphs]
+    logging.info(
+        "components per graph: mean %.2f, max %d; connected graphs: %d/%d",
+        sum(s["num_components"] for s in stats) / len(stats),
+        max(s["num_components"] for s in stats),
+        sum(s["num_components"] == 1 for s in stats),
+        len(stats),
+    )
   # rate = [clique_expanation(g) for g in generated_graphs]
   write_graphs(
       graphs=generated_graphs,
@@ -109,6 +143,8 @@ def main(argv):
           # _ALGORITHM.value,
           _SPLIT.value,
       ),
+      algorithm=_ALGORITHM.value,
+      split=_SPLIT.value,
   )
 
 
@@ -17,9 +17,11 @@ r"""Random graph generation."""
 
 import random
 
-import networkx as nx
 import numpy as np
 import dhg 
+from hypergraph_incidence import Incidence
+import hypergraph_fs
+import hypergraph_incidence
 
 
 
@@ -33,6 +35,8 @@ _NUMBER_OF_COMMUNITIES_RANGE = {
     "medium": np.arange(2, 8),
     "large": np.arange(2, 10),
 }
+# draws of one hypergraph before generate_graphs gives up on max_components
+_MAX_COMPONENT_DRAWS = 1000
 
 
 def generate_graphs(
@@ -42,6 +46,7 @@ def generate_graphs(
     random_seed = 1234,
     er_min_sparsity = 0.0,
     er_max_sparsity = 1.0,
+    max_components = 0,
 ):
   """Generating multiple graphs using the provided algorithms.
 
@@ -52,11 +57,14 @@ def generate_graphs(
     random_seed: the random seed to generate graphs with.
     er_min_sparsity: minimum sparsity of er graphs.
     er_max_sparsity: maximum sparsity of er graphs.
+    max_components: if positive, hypergraphs with more connected components
+      (isolated vertices included) are redrawn, up to _MAX_COMPONENT_DRAWS times.
 
   Returns:
     generated_graphs: a list of nx graphs.
   Raises:
     NotImplementedError: if the algorithm is not yet implemented.
+    ValueError: if no hypergraph within max_components was drawn.
   """
 
   random.seed(random_seed)
@@ -72,18 +80,22 @@ def generate_graphs(
       number_of_vertices = random.choice(_NUMBER_OF_NODES_RANGE[graph_sizes[i]])
       number_of_hypedges = random.choice(range(int(number_of_vertices*0.2),int(number_of_vertices*1.5)))
       sparsity = [random.uniform(er_min_sparsity, er_max_sparsity) for i in range(number_of_hypedges)]
-      generated_graphs.append(
-        dhg.random.hypergraph_Gnm(num_v=int(number_of_vertices),num_e=number_of_hypedges)
+      graph = draw_within_components(
+          lambda: dhg.random.hypergraph_Gnm(num_v=int(number_of_vertices),num_e=number_of_hypedges),
+          max_components,
       )
+      generated_graphs.append(graph)
   elif algorithm == "graph1":
     for i in range(number_of_graphs):
       number_of_vertices = random.choice(_NUMBER_OF_NODES_RANGE[graph_sizes[i]])
       number_of_hypedges = random.choice(range(int(number_of_vertices*0.2),int(number_of_vertices*1.5))) # TODO 记得改点的数目和边的数目
       prob_k_list = [0 for k in range(number_of_vertices-1)]
       prob_k_list[0] = 1 #
-      generated_graphs.append(
-        dhg.random.hypergraph_Gnm(num_v=int(number_of_vertices),num_e=number_of_hypedges,method="custom",prob_k_list=prob_k_list)
+      graph = draw_within_components(
+          lambda: dhg.random.hypergraph_Gnm(num_v=int(number_of_vertices),num_e=number_of_hypedges,method="custom",prob_k_list=prob_k_list),
+          max_components,
       )
+      generated_graphs.append(graph)
   elif algorithm == "graph2":
     for i in range(number_of_graphs):
       number_of_vertices = random.choice(np.arange(5, 10))
@@ -100,9 +112,11 @@ def generate_graphs(
       number_of_vertices = random.choice(_NUMBER_OF_NODES_RANGE[graph_sizes[i]])
       number_of_hypedges = random.choice(range(int(number_of_vertices*0.2),int(number_of_vertices*1.5)))
       prob_k_list = [2 ** (-k) for k in range(number_of_vertices-1)]
-      generated_graphs.append(
-        dhg.random.hypergraph_Gnm(num_v=int(number_of_vertices),num_e=number_of_hypedges,method="custom",prob_k_list=prob_k_list)
+      graph = draw_within_components(
+          lambda: dhg.random.hypergraph_Gnm(num_v=int(number_of_vertices),num_e=number_of_hypedges,method="custom",prob_k_list=prob_k_list),
+          max_components,
       )
+      generated_graphs.append(graph)
   else:
     raise NotImplementedError()
   return generated_graphs
@@ -110,6 +124,43 @@ def generate_graphs(
 
 
 
+def component_stats(graph):
+  """Connected component statistics of a dhg hypergraph, see hypergraph_incidence.component_stats."""
+  labels = Incidence.from_edges(graph.num_v, graph.e[0]).component_labels()
+  return hypergraph_incidence.component_stats(labels)
+
+
+def within_components(graph, max_components):
+  """Whether the hypergraph has at most max_components connected components (always True if max_components <= 0)."""
+  if max_components <= 0:
+    return True
+  return component_stats(graph)['num_components'] <= max_components
+
+
+def draw_within_components(draw, max_components):
+  """Calls draw() until it returns a hypergraph within max_components.
+
+  Args:
+    draw: callable returning a new random dhg hypergraph.
+    max_components: see within_components.
+
+  Returns:
+    the first drawn hypergraph with at most max_components components.
+  Raises:
+    ValueError: if none of _MAX_COMPONENT_DRAWS draws was within max_components,
+      e.g. when the number of vertices and hyperedges cannot connect the graph.
+  """
+  for _ in range(_MAX_COMPONENT_DRAWS):
+    graph = draw()
+    if within_components(graph, max_components):
+      return graph
+  raise ValueError(
+      f'no hypergraph with {graph.num_v} vertices and {graph.num_e} hyperedges'
+      f' had at most {max_components} connected components in'
+      f' {_MAX_COMPONENT_DRAWS} draws, raise --max_components'
+  )
+
+
 def random_hypergraph(n,e,p,seed):
   """
   n : number of vertices in hypergraph 
@@ -130,11 +181,11 @@ def random_hypergraph(n,e,p,seed):
 
 import pickle
 def write_graph_pkl(HypeGraph,path):
-  with open(path, 'wb') as f:
+  with hypergraph_fs.open(path, 'wb') as f:
     pickle.dump(HypeGraph, f)
   
 def load_graph_pkl(HypeGraph,path):
-  with open(path, 'rb') as f:
+  with hypergraph_fs.open(path, 'rb') as f:
     loaded_data = pickle.load(f)
   return loaded_data
 
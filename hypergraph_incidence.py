@@ -0,0 +1,257 @@
+import itertools
+import numpy as np
+
+
+def component_stats(labels):
+    """
+    Summary of the component sizes given by a label array
+    """
+    sizes = np.bincount(labels) if len(labels) else np.zeros(0, dtype=np.int64)
+    return {
+        'num_components': len(sizes),
+        'largest_component': int(sizes.max()) if len(sizes) else 0,
+        'isolated_vertices': int((sizes == 1).sum()),
+        'sizes': sorted(sizes.tolist(), reverse=True),
+    }
+
+
+def gather(ptr, data, rows):
+    """
+    Concatenate the segments data[ptr[r]:ptr[r+1]] for every r in rows, in the order of rows.
+    return: (values, lengths), lengths[i] is the size of the segment of rows[i]
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    starts = ptr[rows]
+    lengths = ptr[rows + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return data[:0], lengths
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return data[offsets + np.arange(total)], lengths
+
+
+class Incidence:
+    """
+    Compressed incidence structure of a hypergraph.
+    CSC part (edge -> vertices): e_ptr, e_vertices; CSR part (vertex -> edges): v_ptr, v_edges.
+    Vertex ids must lie in [0, num_v), hyperedges keep their input order and vertex order.
+    """
+    __slots__ = ('num_v', 'num_e', 'e_ptr', 'e_vertices', 'v_ptr', 'v_edges')
+
+    def __init__(self, num_v, e_ptr, e_vertices):
+        self.num_v = int(num_v)
+        self.num_e = len(e_ptr) - 1
+        self.e_ptr = np.asarray(e_ptr, dtype=np.int64)
+        self.e_vertices = np.asarray(e_vertices, dtype=np.int32)
+        sizes = np.diff(self.e_ptr)
+        edge_ids = np.repeat(np.arange(self.num_e, dtype=np.int32), sizes)
+        order = np.argsort(self.e_vertices, kind='stable')
+        self.v_edges = edge_ids[order]
+        self.v_ptr = np.zeros(self.num_v + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.e_vertices, minlength=self.num_v), out=self.v_ptr[1:])
+
+    @classmethod
+    def from_arrays(cls, num_v, e_ptr, e_vertices, v_ptr, v_edges):
+        """
+        Wrap already built CSC/CSR arrays without copying them (e.g. views on shared memory)
+        """
+        incidence = cls.__new__(cls)
+        incidence.num_v = int(num_v)
+        incidence.num_e = len(e_ptr) - 1
+        incidence.e_ptr = e_ptr
+        incidence.e_vertices = e_vertices
+        incidence.v_ptr = v_ptr
+        incidence.v_edges = v_edges
+        return incidence
+
+    def arrays(self):
+        """
+        return the (name, array) pairs that fully describe the structure
+        """
+        return [('e_ptr', self.e_ptr), ('e_vertices', self.e_vertices), ('v_ptr', self.v_ptr), ('v_edges', self.v_edges)]
+
+    @classmethod
+    def from_edges(cls, num_v, edges):
+        """
+        Build the structure from a list of hyperedges (lists or tuples of vertex ids)
+        """
+        sizes = np.fromiter(map(len, edges), dtype=np.int64, count=len(edges))
+        e_ptr = np.zeros(len(edges) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=e_ptr[1:])
+        e_vertices = np.fromiter(itertools.chain.from_iterable(edges), dtype=np.int32, count=int(e_ptr[-1]))
+        return cls(num_v, e_ptr, e_vertices)
+
+    @property
+    def nbytes(self):
+        return self.e_ptr.nbytes + self.e_vertices.nbytes + self.v_ptr.nbytes + self.v_edges.nbytes
+
+    def hyperedges(self):
+        """
+        return the hyperedges as a list of tuples
+        """
+        flat = self.e_vertices.tolist()
+        ptr = self.e_ptr.tolist()
+        return [tuple(flat[ptr[i]:ptr[i + 1]]) for i in range(self.num_e)]
+
+    def permuted_edges(self, perms):
+        """
+        Relabel every vertex v to perm[v] in one vectorized pass, vertices sorted inside each hyperedge.
+        perms: a permutation of range(num_v), or a (K, num_v) array of K permutations
+        return: the list of hyperedges (tuples) for one permutation, a list of K such lists for a batch
+        """
+        perms = np.asarray(perms, dtype=np.int64)
+        batch = perms.reshape(-1, self.num_v)
+        owners = np.repeat(np.arange(self.num_e, dtype=np.int64), self.degree_e())
+        keys = np.sort(owners * self.num_v + batch[:, self.e_vertices], axis=1) % self.num_v
+        ptr = self.e_ptr.tolist()
+        result = []
+        for row in keys.tolist():
+            result.append([tuple(row[ptr[i]:ptr[i + 1]]) for i in range(self.num_e)])
+        return result if perms.ndim == 2 else result[0]
+
+    def vertices(self, edge):
+        """
+        return the vertices of a hyperedge
+        """
+        return self.e_vertices[self.e_ptr[edge]:self.e_ptr[edge + 1]]
+
+    def edges(self, vertex):
+        """
+        return the hyperedge indices contain the vertex, in increasing order
+        """
+        return self.v_edges[self.v_ptr[vertex]:self.v_ptr[vertex + 1]]
+
+    def degree_v(self):
+        return np.diff(self.v_ptr)
+
+    def degree_e(self):
+        return np.diff(self.e_ptr)
+
+    def degree(self, vertex):
+        return int(self.v_ptr[vertex + 1] - self.v_ptr[vertex])
+
+    def neighbor(self, source):
+        """
+        return the sorted neighborhood of source, excluding source itself
+        """
+        verts, _ = gather(self.e_ptr, self.e_vertices, self.edges(source))
+        verts = np.unique(verts)
+        return verts[verts != source]
+
+    def clique_expanation(self):
+        """
+        Clique expansion keeping the hyperedge index, one row (a, b, i) with a < b per vertex pair of hyperedge i.
+        Rows are ordered like itertools.combinations over the sorted vertices of the hyperedges in order.
+        """
+        sizes = self.degree_e()
+        parts = []
+        for size in np.unique(sizes):
+            if size < 2:
+                continue
+            edge_ids = np.flatnonzero(sizes == size)
+            members = np.sort(self.e_vertices[self.e_ptr[edge_ids][:, None] + np.arange(size)], axis=1)
+            rows, cols = np.triu_indices(size, 1)
+            a = members[:, rows]
+            b = members[:, cols]
+            ids = np.broadcast_to(edge_ids[:, None], a.shape)
+            parts.append(np.stack([a.ravel(), b.ravel(), ids.ravel()], axis=1))
+        if not parts:
+            return np.zeros((0, 3), dtype=np.int64)
+        pairs = np.concatenate(parts).astype(np.int64)
+        return pairs[np.argsort(pairs[:, 2], kind='stable')]
+
+    def clique_expanation_low(self):
+        """
+        Low-order clique expansion, the distinct vertex pairs (a, b) with a < b sorted lexicographically
+        """
+        pairs = self.clique_expanation()[:, :2]
+        if len(pairs) == 0:
+            return pairs
+        keys = np.unique(pairs[:, 0] * self.num_v + pairs[:, 1])
+        return np.stack([keys // self.num_v, keys % self.num_v], axis=1)
+
+    def component_labels(self):
+        """
+        Connected components by union-find over the hyperedges (union by smaller root id, path halving).
+        return: int32 array, label of every vertex; labels are numbered by the smallest vertex of each component
+        """
+        parent = list(range(self.num_v))
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        flat = self.e_vertices.tolist()
+        ptr = self.e_ptr.tolist()
+        for i in range(self.num_e):
+            if ptr[i] == ptr[i + 1]:
+                continue
+            root = find(flat[ptr[i]])
+            for vertex in flat[ptr[i] + 1:ptr[i + 1]]:
+                other = find(vertex)
+                if other < root:
+                    parent[root] = other
+                    root = other
+                elif other > root:
+                    parent[other] = root
+        roots = np.fromiter((find(v) for v in range(self.num_v)), dtype=np.int64, count=self.num_v)
+        return np.unique(roots, return_inverse=True)[1].astype(np.int32)
+
+    def short_path(self, source, target):
+        """
+        Shortest path between two vertices, in the format of HyperGraph.short_path:
+        [(vertex, hyperedge to the next vertex), ..., (target, -1)], None if target is unreachable.
+        """
+        if source == target:
+            return [(source, -1)]
+        previous = np.full((self.num_v, 2), -1, dtype=np.int64)
+        seen = np.zeros(self.num_v, dtype=bool)
+        seen[source] = True
+        frontier = np.array([source], dtype=np.int64)
+        while len(frontier):
+            edge_ids, counts = gather(self.v_ptr, self.v_edges, frontier)
+            owners = np.repeat(frontier, counts)
+            verts, sizes = gather(self.e_ptr, self.e_vertices, edge_ids)
+            owners = np.repeat(owners, sizes)
+            edge_ids = np.repeat(edge_ids, sizes)
+            fresh = ~seen[verts]
+            verts, first = np.unique(verts[fresh], return_index=True)
+            previous[verts, 0] = owners[fresh][first]
+            previous[verts, 1] = edge_ids[fresh][first]
+            seen[verts] = True
+            if seen[target]:
+                path = [(int(target), -1)]
+                while path[-1][0] != source:
+                    vertex, edge = previous[path[-1][0]]
+                    path.append((int(vertex), int(edge)))
+                return path[::-1]
+            frontier = verts
+        return None
+
+    def distance_matrix(self, block=1024):
+        """
+        All-pairs hop distances by a multi-source BFS on the dense incidence matrix,
+        one boolean frontier row per source and `block` sources at a time.
+        return: (num_v, num_v) int16/int32 matrix, -1 for unreachable pairs
+        """
+        n = self.num_v
+        H = np.zeros((n, self.num_e), dtype=np.float32)
+        H[self.e_vertices, np.repeat(np.arange(self.num_e), self.degree_e())] = 1
+        dist = np.full((n, n), -1, dtype=np.int16 if n < np.iinfo(np.int16).max else np.int32)
+        for start in range(0, n, block):
+            rows = np.arange(start, min(n, start + block))
+            reached = np.zeros((len(rows), n), dtype=bool)
+            reached[np.arange(len(rows)), rows] = True
+            block_dist = dist[rows]
+            block_dist[reached] = 0
+            frontier = reached.copy()
+            hop = 0
+            while frontier.any():
+                hop += 1
+                frontier = ((frontier.astype(np.float32) @ H) @ H.T > 0) & ~reached
+                block_dist[frontier] = hop
+                reached |= frontier
+            dist[rows] = block_dist
+        return dist
@@ -0,0 +1,133 @@
+import hashlib
+
+
+def _rank(keys):
+    """
+    Replace every key by the rank of its value among the distinct values, an isomorphism invariant relabelling
+    """
+    order = {k: i for i, k in enumerate(sorted(set(keys)))}
+    return [order[k] for k in keys]
+
+
+def refine(num_v, edges, incident, colors):
+    """
+    Colour refinement (1-WL) on the vertex-hyperedge incidence graph until the vertex partition is stable.
+    incident: incident[v] is the list of hyperedge indices containing v
+    colors: initial vertex colours (ints)
+    return: the stable vertex colours, ranked to 0..k-1
+    """
+    colors = _rank(colors)
+    while True:
+        edge_colors = _rank([(len(e), tuple(sorted(colors[v] for v in e))) for e in edges])
+        refined = _rank([(colors[v], tuple(sorted(edge_colors[i] for i in incident[v]))) for v in range(num_v)])
+        if max(refined, default=-1) == max(colors, default=-1):
+            return refined
+        colors = refined
+
+
+def _relabelled(edges, labels):
+    return tuple(sorted(tuple(sorted(labels[v] for v in e)) for e in edges))
+
+
+def _same_orbit(a, b, automorphisms):
+    """
+    Whether some product of the automorphisms maps vertex a to vertex b
+    """
+    seen = {a}
+    stack = [a]
+    while stack:
+        x = stack.pop()
+        for perm in automorphisms:
+            y = perm[x]
+            if y == b:
+                return True
+            if y not in seen:
+                seen.add(y)
+                stack.append(y)
+    return False
+
+
+def canonical_labeling(num_v, edges):
+    """
+    Canonical labelling by individualization-refinement: refine the degree partition, then recursively
+    individualize each vertex of the first smallest non-singleton cell and keep the leaf whose relabelled
+    hyperedge list is lexicographically smallest. Branches in the same orbit of the automorphisms found so far
+    (restricted to those fixing the individualized vertices) are skipped.
+    return: labels, labels[v] is the canonical id of vertex v
+    """
+    edges = [tuple(e) for e in edges]
+    incident = [[] for _ in range(num_v)]
+    for i, e in enumerate(edges):
+        for v in e:
+            incident[v].append(i)
+    best = [None, None]
+    # vertices lying in exactly the same hyperedges (e.g. isolated vertices) can be swapped freely
+    automorphisms = []
+    twins = {}
+    for v in range(num_v):
+        twins.setdefault(tuple(incident[v]), []).append(v)
+    for group in twins.values():
+        for a, b in zip(group, group[1:]):
+            perm = list(range(num_v))
+            perm[a], perm[b] = b, a
+            automorphisms.append(perm)
+
+    def search(colors, prefix):
+        cells = {}
+        for v, c in enumerate(colors):
+            cells.setdefault(c, []).append(v)
+        targets = [cell for cell in cells.values() if len(cell) > 1]
+        if not targets:
+            cert = _relabelled(edges, colors)
+            if best[0] is None or cert < best[0]:
+                best[0], best[1] = cert, colors
+            elif cert == best[0]:
+                # colors and best[1] give the same relabelled hypergraph: best^-1 o colors is an automorphism
+                inverse = {label: v for v, label in enumerate(best[1])}
+                automorphisms.append([inverse[label] for label in colors])
+            return
+        cell = min(targets, key=lambda c: (len(c), colors[c[0]]))
+        tried = []
+        for v in cell:
+            stabilizer = [p for p in automorphisms if all(p[u] == u for u in prefix)]
+            if any(_same_orbit(u, v, stabilizer) for u in tried):
+                continue
+            tried.append(v)
+            individualized = [2 * c + 1 for c in colors]
+            individualized[v] -= 1
+            search(refine(num_v, edges, incident, individualized), prefix + [v])
+
+    degrees = [len(incident[v]) for v in range(num_v)]
+    search(refine(num_v, edges, incident, degrees), [])
+    return best[1] if best[1] is not None else []
+
+
+def canonical_form(num_v, edges):
+    """
+    return: (num_v, sorted hyperedges under the canonical labelling), equal for two hypergraphs iff they are isomorphic
+    """
+    labels = canonical_labeling(num_v, edges)
+    return num_v, _relabelled(edges, labels)
+
+
+def certificate(num_v, edges):
+    """
+    return: hex digest of the canonical form, usable as a dict key to group isomorphic hypergraphs
+    """
+    return hashlib.sha1(repr(canonical_form(num_v, edges)).encode()).hexdigest()
+
+
+def deduplicate(graphs):
+    """
+    Keep the first hypergraph of every isomorphism class
+    graphs: objects with v and e[0] (HyperGraph or dhg.Hypergraph)
+    return: indices of the kept graphs
+    """
+    seen = set()
+    kept = []
+    for i, graph in enumerate(graphs):
+        cert = graph.certificate() if hasattr(graph, 'certificate') else certificate(len(graph.v), graph.e[0])
+        if cert not in seen:
+            seen.add(cert)
+            kept.append(i)
+    return kept
@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+
+
+def import_times(module, directory=None):
+    """
+    Import the module in a fresh interpreter with -X importtime.
+    directory: where the module lives (the working directory of the child interpreter)
+    return: (total microseconds, [(module imported directly by it, cumulative microseconds), ...] slowest first)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=directory, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(cumulative), depth))
+    root = max(i for i, row in enumerate(rows) if row[0] == module)
+    base = rows[root][2]
+    children = []
+    for name, cumulative, depth in reversed(rows[:root]):
+        if depth <= base:
+            break
+        if depth == base + 1:
+            children.append((name, cumulative))
+    return rows[root][1], sorted(children, key=lambda c: -c[1])
+
+
+def startup_report(module, directory=None, top=15):
+    """
+    Text table of the import time of the module and of its slowest direct imports
+    """
+    total, children = import_times(module, directory or os.getcwd())
+    lines = [f'startup import time of {module}: {total / 1e6:.3f}s']
+    for name, cumulative in children[:top]:
+        lines.append(f'  {cumulative / 1e6:8.3f}s  {name}')
+    return '\n'.join(lines)
@@ -0,0 +1,161 @@
+from multiprocessing import Pool
+from multiprocessing import shared_memory
+import numpy as np
+
+from hypergraph_incidence import Incidence, gather
+
+
+class SubgraphSampler:
+    """
+    Neighborhood sampling of small sub-hypergraphs from a large hypergraph given as an Incidence.
+    Each sample grows a vertex set by randomized BFS from random centers and returns the hyperedges induced on it
+    (restricted to the sampled vertices, relabelled to 0..k-1, keeping only those with at least two vertices).
+    """
+
+    def __init__(self, incidence, size_ranges):
+        """
+        size_ranges: dict mapping a size category to the candidate numbers of vertices, e.g. _NUMBER_OF_NODES_RANGE
+        """
+        self.incidence = incidence
+        self.size_ranges = [np.asarray(r) for r in size_ranges.values()]
+        if not (incidence.degree_e() > 1).any():
+            raise ValueError("The hypergraph has no hyperedge with two or more vertices to sample from.")
+
+    def sample_vertices(self, rng, number_of_vertices):
+        """
+        Randomized BFS: every visited vertex keeps a random subset of its neighbors, and each level adds at most
+        half of the requested number of vertices. A new random center is drawn whenever the frontier dies out.
+        return: sorted array of the sampled vertex ids
+        """
+        inc = self.incidence
+        selected = np.zeros(inc.num_v, dtype=bool)
+        order = []
+        half = max(1, number_of_vertices // 2)
+        while len(order) < number_of_vertices:
+            center = int(rng.integers(inc.num_v))
+            if not selected[center]:
+                selected[center] = True
+                order.append(center)
+            queue = [center]
+            while queue and len(order) < number_of_vertices:
+                level = []
+                for vertex in queue:
+                    nbrs = inc.neighbor(vertex)
+                    keep = max(1, int(rng.random() * number_of_vertices * 0.5))
+                    if len(nbrs) > keep:
+                        nbrs = rng.choice(nbrs, size=keep, replace=False)
+                    level.append(nbrs)
+                level = np.unique(np.concatenate(level)) if level else np.zeros(0, dtype=np.int32)
+                level = level[~selected[level]]
+                if len(level) > half:
+                    level = rng.choice(level, size=half, replace=False)
+                level = level[:number_of_vertices - len(order)]
+                selected[level] = True
+                order.extend(level.tolist())
+                queue = level.tolist()
+        return np.sort(np.asarray(order, dtype=np.int64))
+
+    def induced_edges(self, vertices):
+        """
+        Hyperedges induced on the vertex set, relabelled by rank in `vertices` (which must be sorted).
+        Only the hyperedges incident to the sampled vertices are touched.
+        return: sorted list of distinct vertex tuples of size >= 2
+        """
+        inc = self.incidence
+        relabel = np.full(inc.num_v, -1, dtype=np.int64)
+        relabel[vertices] = np.arange(len(vertices))
+        edge_ids, _ = gather(inc.v_ptr, inc.v_edges, vertices)
+        edge_ids = np.unique(edge_ids)
+        members, sizes = gather(inc.e_ptr, inc.e_vertices, edge_ids)
+        members = relabel[members]
+        owners = np.repeat(np.arange(len(edge_ids)), sizes)
+        inside = members >= 0
+        members, owners = members[inside], owners[inside]
+        order = np.lexsort((members, owners))
+        members, owners = members[order], owners[order]
+        counts = np.bincount(owners, minlength=len(edge_ids))
+        bounds = np.concatenate([[0], np.cumsum(counts)]).tolist()
+        flat = members.tolist()
+        edges = {tuple(flat[bounds[i]:bounds[i + 1]]) for i in np.flatnonzero(counts > 1).tolist()}
+        return sorted(edges)
+
+    def sample(self, rng):
+        """
+        Draw one sub-hypergraph.
+        return: (number of vertices, list of hyperedges)
+        """
+        while True:
+            sizes = self.size_ranges[int(rng.integers(len(self.size_ranges)))]
+            number_of_vertices = min(int(rng.choice(sizes)), self.incidence.num_v)
+            vertices = self.sample_vertices(rng, number_of_vertices)
+            edges = self.induced_edges(vertices)
+            if edges:
+                return len(vertices), edges
+
+    def sample_batch(self, number_of_samples, seed):
+        """
+        Draw number_of_samples sub-hypergraphs, sample i using its own stream spawned from SeedSequence(seed),
+        so any sample can be regenerated on its own.
+        """
+        streams = np.random.SeedSequence(seed).spawn(number_of_samples)
+        return [self.sample(np.random.default_rng(s)) for s in streams]
+
+    def sample_range(self, seed, start, stop):
+        """
+        Samples start..stop-1 of sample_batch(n, seed), for any n >= stop
+        """
+        return [
+            self.sample(np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(i,))))
+            for i in range(start, stop)
+        ]
+
+
+_WORKER_SAMPLER = None
+_WORKER_SEGMENTS = None
+
+
+def _attach_worker(num_v, layout, size_ranges):
+    """
+    Pool initializer: map the shared incidence arrays and build the worker's sampler on top of them
+    """
+    global _WORKER_SAMPLER, _WORKER_SEGMENTS
+    _WORKER_SEGMENTS = []
+    arrays = {}
+    for name, shm_name, dtype, length in layout:
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _WORKER_SEGMENTS.append(shm)
+        arrays[name] = np.ndarray((length,), dtype=dtype, buffer=shm.buf)
+    _WORKER_SAMPLER = SubgraphSampler(Incidence.from_arrays(num_v, **arrays), size_ranges)
+
+
+def _sample_chunk(args):
+    seed, start, stop = args
+    return _WORKER_SAMPLER.sample_range(seed, start, stop)
+
+
+def parallel_sample_batch(incidence, size_ranges, number_of_samples, seed, processes=None, chunksize=64):
+    """
+    Same samples, in the same order, as SubgraphSampler(incidence, size_ranges).sample_batch(number_of_samples, seed),
+    computed by a process pool. The incidence arrays are copied once into shared memory and mapped by every worker.
+    """
+    segments = []
+    layout = []
+    try:
+        for name, array in incidence.arrays():
+            shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+            segments.append(shm)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+            layout.append((name, shm.name, array.dtype.str, len(array)))
+        chunks = [
+            (seed, start, min(start + chunksize, number_of_samples))
+            for start in range(0, number_of_samples, chunksize)
+        ]
+        with Pool(processes, initializer=_attach_worker, initargs=(incidence.num_v, layout, size_ranges)) as pool:
+            samples = []
+            for chunk in pool.imap(_sample_chunk, chunks):
+                samples.extend(chunk)
+        return samples
+    finally:
+        for shm in segments:
+            shm.close()
+            shm.unlink()
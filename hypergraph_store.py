@@ -0,0 +1,307 @@
+import json
+import os
+import pickle
+
+import numpy as np
+
+import hypergraph_fs
+from hyper_graph import LiteHyperGraph
+from hypergraph_incidence import Incidence
+
+# Name of the store file inside a split directory, next to (or instead of) the {ind}.pkl files
+STORE_FILE_NAME = 'graphs.hgs'
+
+_MAGIC = b'HGSTORE1'
+_ALIGNMENT = 64
+
+
+def _edges_of(graph):
+    """
+    (number of vertices, hyperedges) of a dhg.Hypergraph, a HyperGraph / LiteHyperGraph or a {'vertex', 'hypedges'} dict
+    """
+    if isinstance(graph, dict):
+        return len(graph['vertex']), graph['hypedges']
+    return len(graph.v), graph.e[0]
+
+
+class GraphStoreWriter:
+    """
+    Collects hypergraphs and writes them as one columnar store file:
+    - graph_ptr (int64, num_graphs + 1): hyperedges of graph i are graph_ptr[i]..graph_ptr[i+1]-1
+    - edge_ptr (int64, num_edges + 1): vertices of hyperedge j are vertices[edge_ptr[j]:edge_ptr[j+1]]
+    - vertices (int32): the vertex ids of every hyperedge of every graph, flat
+    - num_v (int32), algorithm and split (int16 codes into the header lists): per-graph metadata
+    The file is an 8-byte magic, the uint64 length of a JSON header (array offsets, dtypes, lengths and the
+    algorithm / split names), the header, and the arrays, each aligned to 64 bytes so that np.memmap can map them.
+    """
+
+    def __init__(self):
+        self._num_v = []
+        self._edge_counts = []
+        self._edge_sizes = []
+        self._vertices = []
+        self._algorithm = []
+        self._split = []
+        self._names = {'algorithm': {}, 'split': {}}
+
+    def _code(self, column, name):
+        return self._names[column].setdefault(name, len(self._names[column]))
+
+    def add(self, graph, algorithm='', split=''):
+        num_v, edges = _edges_of(graph)
+        self._num_v.append(num_v)
+        self._edge_counts.append(len(edges))
+        for e in edges:
+            self._edge_sizes.append(len(e))
+            self._vertices.extend(e)
+        self._algorithm.append(self._code('algorithm', algorithm))
+        self._split.append(self._code('split', split))
+
+    def __len__(self):
+        return len(self._num_v)
+
+    def arrays(self):
+        """
+        return the (name, array) pairs of the store
+        """
+        graph_ptr = np.zeros(len(self._edge_counts) + 1, dtype=np.int64)
+        np.cumsum(self._edge_counts, out=graph_ptr[1:])
+        edge_ptr = np.zeros(len(self._edge_sizes) + 1, dtype=np.int64)
+        np.cumsum(self._edge_sizes, out=edge_ptr[1:])
+        return [
+            ('graph_ptr', graph_ptr),
+            ('edge_ptr', edge_ptr),
+            ('vertices', np.asarray(self._vertices, dtype=np.int32)),
+            ('num_v', np.asarray(self._num_v, dtype=np.int32)),
+            ('algorithm', np.asarray(self._algorithm, dtype=np.int16)),
+            ('split', np.asarray(self._split, dtype=np.int16)),
+        ]
+
+    def write(self, path):
+        arrays = self.arrays()
+        layout = {}
+        offset = 0
+        for name, array in arrays:
+            layout[name] = [offset, array.dtype.str, len(array)]
+            offset += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+        header = json.dumps({
+            'version': 1,
+            'num_graphs': len(self),
+            'arrays': layout,
+            'algorithms': list(self._names['algorithm']),
+            'splits': list(self._names['split']),
+        }).encode()
+        start = -(-(len(_MAGIC) + 8 + len(header)) // _ALIGNMENT) * _ALIGNMENT
+        hypergraph_fs.makedirs(os.path.dirname(path) or '.')
+        with hypergraph_fs.open(path, 'wb') as f:
+            f.write(_MAGIC + np.uint64(len(header)).tobytes() + header)
+            f.write(b'\0' * (start - len(_MAGIC) - 8 - len(header)))
+            for name, array in arrays:
+                f.write(array.tobytes())
+                f.write(b'\0' * (-array.nbytes % _ALIGNMENT))
+
+
+def write_store(graphs, path, algorithm='', split=''):
+    """
+    Write a list of hypergraphs as one store file
+    """
+    writer = GraphStoreWriter()
+    for graph in graphs:
+        writer.add(graph, algorithm, split)
+    writer.write(path)
+
+
+class ColumnarGraphStore:
+    """
+    Read side of a store file. Local files are mapped with np.memmap (remote ones are read once), and the arrays
+    are views on it: the hyperedges of any graph are sliced out without copying or reading the other graphs.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        buffer = hypergraph_fs.map_bytes(path)
+        if bytes(buffer[:len(_MAGIC)]) != _MAGIC:
+            raise ValueError(f'{path} is not a hypergraph store file')
+        length = int(buffer[len(_MAGIC):len(_MAGIC) + 8].view(np.uint64)[0])
+        header = json.loads(bytes(buffer[len(_MAGIC) + 8:len(_MAGIC) + 8 + length]))
+        start = -(-(len(_MAGIC) + 8 + length) // _ALIGNMENT) * _ALIGNMENT
+        self.algorithms = header['algorithms']
+        self.splits = header['splits']
+        for name, (offset, dtype, count) in header['arrays'].items():
+            dtype = np.dtype(dtype)
+            view = buffer[start + offset:start + offset + count * dtype.itemsize].view(dtype)
+            setattr(self, name, view)
+        self._buffer = buffer
+
+    def __len__(self):
+        return len(self.num_v)
+
+    @property
+    def num_e(self):
+        return np.diff(self.graph_ptr)
+
+    def algorithm_of(self, index):
+        return self.algorithms[self.algorithm[index]]
+
+    def split_of(self, index):
+        return self.splits[self.split[index]]
+
+    def edge_arrays(self, index):
+        """
+        Zero-copy views of graph index: (edge_ptr, vertices), the vertices of its hyperedge j being
+        vertices[edge_ptr[j] - edge_ptr[0]:edge_ptr[j+1] - edge_ptr[0]]
+        """
+        edge_ptr = self.edge_ptr[self.graph_ptr[index]:self.graph_ptr[index + 1] + 1]
+        return edge_ptr, self.vertices[edge_ptr[0]:edge_ptr[-1]]
+
+    def hyperedges(self, index):
+        """
+        return the hyperedges of graph index as a list of tuples
+        """
+        edge_ptr, vertices = self.edge_arrays(index)
+        ptr = (edge_ptr - edge_ptr[0]).tolist()
+        flat = vertices.tolist()
+        return [tuple(flat[ptr[i]:ptr[i + 1]]) for i in range(len(ptr) - 1)]
+
+    def incidence(self, index):
+        """
+        return the Incidence of graph index, its vertex array being a view on the store
+        """
+        edge_ptr, vertices = self.edge_arrays(index)
+        return Incidence(self.num_v[index], edge_ptr - edge_ptr[0], vertices)
+
+    def graph(self, index):
+        """
+        return graph index as a LiteHyperGraph
+        """
+        return LiteHyperGraph(list(range(int(self.num_v[index]))), self.hyperedges(index))
+
+    def __getitem__(self, index):
+        return self.graph(index)
+
+    def __iter__(self):
+        return (self.graph(i) for i in range(len(self)))
+
+    def select(self, min_nvertices=None, max_nvertices=None, max_nedges=None, algorithm=None, split=None):
+        """
+        Indices of the graphs passing every given filter, in store order. Only the per-graph index arrays
+        (num_v, graph_ptr, algorithm, split) are read, the hyperedges are not touched.
+        Graphs written without an algorithm or a split ('') pass the corresponding filter.
+        """
+        keep = np.ones(len(self), dtype=bool)
+        if min_nvertices is not None:
+            keep &= self.num_v >= min_nvertices
+        if max_nvertices is not None:
+            keep &= self.num_v <= max_nvertices
+        if max_nedges is not None:
+            keep &= self.num_e <= max_nedges
+        for column, names, name in ((self.algorithm, self.algorithms, algorithm), (self.split, self.splits, split)):
+            if name is not None:
+                accepted = [code for code, n in enumerate(names) if n in (name, '')]
+                keep &= np.isin(column, accepted)
+        return np.flatnonzero(keep)
+
+
+_OPEN_STORES = {}
+
+
+def open_store(path):
+    """
+    The ColumnarGraphStore of path, opened (mapped) once per process
+    """
+    if path not in _OPEN_STORES:
+        _OPEN_STORES[path] = ColumnarGraphStore(path)
+    return _OPEN_STORES[path]
+
+
+class StoredGraphs:
+    """
+    Lazy sequence of the graphs indices of a store file: a graph is only decoded into a LiteHyperGraph when it
+    is first accessed, and then kept. Slices are lazy too and share the decoded graphs. Pickling only sends the
+    path and the indices, so pool workers map the store themselves and decode just the graphs of their units.
+    """
+
+    def __init__(self, path, indices, graphs=None):
+        self.path = path
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self._graphs = graphs if graphs is not None else {}
+
+    def __getstate__(self):
+        return self.path, self.indices
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return StoredGraphs(self.path, self.indices[item], self._graphs)
+        index = int(self.indices[item])
+        if index not in self._graphs:
+            self._graphs[index] = open_store(self.path).graph(index)
+        return self._graphs[index]
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        if not len(other):
+            return self
+        return list(other) + list(self)
+
+    @property
+    def num_v(self):
+        return open_store(self.path).num_v[self.indices]
+
+    @property
+    def num_e(self):
+        return open_store(self.path).num_e[self.indices]
+
+
+def load_store_graphs(path, min_nvertices=None, max_nvertices=None, max_nedges=None, algorithm=None, split=None):
+    """
+    The graphs of a store file passing the filters of ColumnarGraphStore.select, as a lazy StoredGraphs
+    """
+    indices = open_store(path).select(min_nvertices, max_nvertices, max_nedges, algorithm, split)
+    return StoredGraphs(path, indices)
+
+
+def _pkl_files(pkl_dir):
+    """
+    The {ind}.pkl files of a directory, by increasing ind
+    """
+    names = [f for f in hypergraph_fs.listdir(pkl_dir) if f.endswith('.pkl')]
+    return sorted(names, key=lambda f: (len(f), f))
+
+
+def pkl_dir_to_store(pkl_dir, path=None, algorithm='', split=''):
+    """
+    Convert a directory of {ind}.pkl graphs to a store file (default: STORE_FILE_NAME inside the directory),
+    graph i of the store being the i-th file by increasing ind
+    return: the path of the store
+    """
+    path = path or os.path.join(pkl_dir, STORE_FILE_NAME)
+    writer = GraphStoreWriter()
+    for name in _pkl_files(pkl_dir):
+        with hypergraph_fs.open(os.path.join(pkl_dir, name), 'rb') as f:
+            writer.add(pickle.load(f), algorithm, split)
+    writer.write(path)
+    return path
+
+
+def store_to_pkl_dir(path, pkl_dir):
+    """
+    Write every graph of a store file back as {ind}.pkl dhg.Hypergraph pickles, the former layout
+    """
+    import dhg
+    store = ColumnarGraphStore(path)
+    hypergraph_fs.makedirs(pkl_dir)
+    for index in range(len(store)):
+        graph = dhg.Hypergraph(int(store.num_v[index]), store.hyperedges(index))
+        with hypergraph_fs.open(os.path.join(pkl_dir, f'{index}.pkl'), 'wb') as f:
+            pickle.dump(graph, f)
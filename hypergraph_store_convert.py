@@ -0,0 +1,64 @@
+# coding=utf-8
+# Copyright 2024 The Google Research Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+r"""Converts graph directories between {ind}.pkl files and a graphs.hgs store.
+
+To store (graphs.hgs is written inside each split directory):
+  python3 -m hypergraph_store_convert --to=store --graphs_dir=./hypergraphs \
+      --algorithm=hypergraph --split=test
+
+Back to pickles:
+  python3 -m hypergraph_store_convert --to=pkl --graphs_dir=./hypergraphs \
+      --algorithm=hypergraph --split=test
+"""
+
+import os
+
+from absl import app
+from absl import flags
+from absl import logging
+import hypergraph_store
+
+_TO = flags.DEFINE_enum(
+    'to', None, ['store', 'pkl'], 'The layout to convert to.', required=True
+)
+_GRAPHS_DIR = flags.DEFINE_string(
+    'graphs_dir', None, 'The directory containing the graphs.', required=True
+)
+_ALGORITHM = flags.DEFINE_string(
+    'algorithm', '', 'The graph generator algorithm (subdirectory of graphs_dir).'
+)
+_SPLIT = flags.DEFINE_list(
+    'split', ['test'], 'Comma-separated splits (subdirectories) to convert.'
+)
+
+
+def main(argv):
+  if len(argv) > 1:
+    raise app.UsageError('Too many command-line arguments.')
+  for split in _SPLIT.value:
+    split_dir = os.path.join(_GRAPHS_DIR.value, _ALGORITHM.value, split)
+    store_path = os.path.join(split_dir, hypergraph_store.STORE_FILE_NAME)
+    if _TO.value == 'store':
+      hypergraph_store.pkl_dir_to_store(
+          split_dir, store_path, algorithm=_ALGORITHM.value, split=split
+      )
+    else:
+      hypergraph_store.store_to_pkl_dir(store_path, split_dir)
+    logging.info('converted %s to %s', split_dir, _TO.value)
+
+
+if __name__ == '__main__':
+  app.run(main)
@@ -17,18 +17,40 @@
 
 import random
 
-import networkx as nx
 import numpy as np
 
 # from graphqa import graph_text_encoder
-from hyper_graph import HyperGraph
+from hyper_graph import LiteHyperGraph
 import hypergraph_text_encoder
+import hypergraph_wl
+
+# The matrices of the isomorphism chains of thought, e.g. [[1,1,0][0,1,1]]:
+# nothing between the rows and no comma after the last cell.
+_ISOMORPHISM_MATRIX_FORMAT = hypergraph_text_encoder.BinaryMatrixFormat(
+    '', trailing_comma=False, closing=']'
+)
+
+
 class GraphTask:
   """The parent class for all the graph tasks."""
 
   def __init__(self):
     self.name = 'default'
     self.maximum_nvertices_cot_graph = 10
+    # Every random draw of the task goes through this generator, which the
+    # caller can reseed for each example.
+    self.rng = random.Random()
+
+  def prepare_unit(self, graphs):
+    """Called with all the graphs of a work unit before their examples.
+
+    The examples are then prepared one graph at a time, each with its own
+    reseeded self.rng, so this is the place for batched precomputation that
+    does not draw from self.rng.
+
+    Args:
+      graphs: the graphs of the unit.
+    """
 
   def prepare_examples_dict(
       self,
@@ -43,6 +65,16 @@ class GraphTask:
   ):
     raise NotImplementedError()
 
+  def random_hypergraph(self, number_of_vertices, number_of_hyperedges):
+    """Draws a hypergraph like dhg.random.hypergraph_Gnm (low order first) from self.rng."""
+    degrees = list(range(2, number_of_vertices + 1))
+    weights = [3 ** (-k) for k in range(len(degrees))]
+    edges = set()
+    while len(edges) < number_of_hyperedges:
+      k = self.rng.choices(degrees, weights=weights)[0]
+      edges.add(tuple(sorted(self.rng.sample(range(number_of_vertices), k))))
+    return LiteHyperGraph(list(range(number_of_vertices)), list(edges))
+
 
 
 class VertexConnectionCheck(GraphTask):
@@ -61,7 +93,7 @@ class VertexConnectionCheck(GraphTask):
     examples_dict = {}
     name_dict = hypergraph_text_encoder.NODE_ENCODER_DICT[encoding_method]
     for ind, graph in enumerate(graphs):
-      source, target = random.sample(list(graph.v), k=2)
+      source, target = self.rng.sample(list(graph.v), k=2)
       question = hypergraph_text_encoder.encode_graph(graph, encoding_method)
       task_description = 'Q: Is vertex %s connected to vertex %s? List the answers after "Ans:" in the format of [Yes, No,].\nA: ' % (
             name_dict[source],
@@ -89,7 +121,7 @@ class VertexConnectionCheck(GraphTask):
       self, graph, encoding_method, cot
   ):
     name_dict = hypergraph_text_encoder.NODE_ENCODER_DICT[encoding_method]
-    source, target = random.sample(list(graph.v), k=2)
+    source, target = self.rng.sample(list(graph.v), k=2)
     question = hypergraph_text_encoder.encode_graph(graph, encoding_method)
     task_description = 'Q: Is vertex %s connected to vertex %s? List the answers after "Ans:" in the format of [Yes, No,].\nA: ' % (
             name_dict[source],
@@ -183,7 +215,7 @@ class VertexDegree(GraphTask):
     name_dict = hypergraph_text_encoder.NODE_ENCODER_DICT[encoding_method]
     for ind, graph in enumerate(graphs):
       question = hypergraph_text_encoder.encode_graph(graph, encoding_method)
-      source_vertex = random.sample(list(graph.v), k=1)[0]
+      source_vertex = self.rng.sample(list(graph.v), k=1)[0]
       task_description = (
           'Q: What is the degree of vertex %s? list the answers after "Ans" in the format like [10].\nA: ' % name_dict[source_vertex]
       )
@@ -250,7 +282,7 @@ class VertexDegree(GraphTask):
   ):
     name_dict = hypergraph_text_encoder.NODE_ENCODER_DICT[encoding_method]
     edge_dict = hypergraph_text_encoder.EDGES_ENCODER_DICT[encoding_method]
-    source_vertex = random.sample(list(graph.v), k=1)[0]
+    source_vertex = self.rng.sample(list(graph.v), k=1)[0]
     question = hypergraph_text_encoder.encode_graph(graph, encoding_method)
     
     question += (
@@ -293,7 +325,7 @@ class HyperedgeDegree(GraphTask):
     edge_dict = hypergraph_text_encoder.EDGES_ENCODER_DICT[encoding_method]
     for ind, graph in enumerate(graphs):
       question = hypergraph_text_encoder.encode_graph(graph, encoding_method)
-      source_edge = random.sample(list(range(len(graph.e[0]))), k=1)[0]
+      source_edge = self.rng.sample(list(range(len(graph.e[0]))), k=1)[0]
       task_description = (
           'Q: What is the degree of hyperedge %s? list the answers after "Ans" in the format like [10].\nA: ' % self.get_edge_string(name_dict,edge_dict,graph,source_edge,encoding_method)
       )
@@ -340,7 +372,7 @@ class HyperedgeDegree(GraphTask):
   ):
     name_dict = hypergraph_text_encoder.NODE_ENCODER_DICT[encoding_method]
     edge_dict = hypergraph_text_encoder.EDGES_ENCODER_DICT[encoding_method]
-    source_edge = random.sample(list(range(len(graph.e[0]))), k=1)[0]
+    source_edge = self.rng.sample(list(range(len(graph.e[0]))), k=1)[0]
     question = hypergraph_text_encoder.encode_graph(graph, encoding_method)
     task_description = (
           'Q: What is the degree of hyperedge %s? list the answers after "Ans" in the format like [10].\nA: ' % self.get_edge_string(name_dict,edge_dict,graph,source_edge,encoding_method)
@@ -458,10 +490,10 @@ class ConnectedVertices(GraphTask):
     name_dict = hypergraph_text_encoder.NODE_ENCODER_DICT[encoding_method]
     for ind, graph in enumerate(graphs):
       question = hypergraph_text_encoder.encode_graph(graph, encoding_method)
-      source_vertex = random.sample(list(graph.v), k=1)[0]
+      source_vertex = self.rng.sample(list(graph.v), k=1)[0]
       task_description = f'Q: List all the vertices connected to {name_dict[source_vertex]} in alphabetical order. List all the answers after "Ans" in the format of [{name_dict[0]},{name_dict[1]},{name_dict[2]}] and separate the answers by a comma.\nA: '
       question += task_description
-      graph = HyperGraph(graph.v,graph.e[0])
+      graph = LiteHyperGraph(graph.v,graph.e[0])
       outgoing_edges = list(graph.edges(source_vertex))
       outgoing_edges = [graph.e[0][i] for i in outgoing_edges]
       if outgoing_edges:
@@ -506,7 +538,7 @@ class ConnectedVertices(GraphTask):
   ):
     name_dict = hypergraph_text_encoder.NODE_ENCODER_DICT[encoding_method]
     question = hypergraph_text_encoder.encode_graph(graph, encoding_method)
-    source_vertex = random.sample(list(graph.v), k=1)[0]
+    source_vertex = self.rng.sample(list(graph.v), k=1)[0]
     task_description = f'Q: List all the vertices connected to {name_dict[source_vertex]} in alphabetical order. List all the answers after "Ans" in the format of [{name_dict[0]},{name_dict[1]},{name_dict[2]}] and separate the answers by a comma.\nA: '
     question += task_description
     outgoing_edges = list(graph.edges(source_vertex))
@@ -548,10 +580,10 @@ class DisconnectedVertices(GraphTask):
     name_dict = hypergraph_text_encoder.NODE_ENCODER_DICT[encoding_method]
     for ind, graph in enumerate(graphs):
       question = hypergraph_text_encoder.encode_graph(graph, encoding_method)
-      source_vertex = random.sample(list(graph.v), k=1)[0]
+      source_vertex = self.rng.sample(list(graph.v), k=1)[0]
       task_description = f'Q: List all the vertices that are not connected to {name_dict[source_vertex]} in alphabetical order. List all the answers after "Ans" in the format of [{name_dict[0]},{name_dict[1]},{name_dict[2]}] and separate the answers by a comma.\nA: '
       question += task_description
-      graph = HyperGraph(graph.v,graph.e[0])
+      graph = LiteHyperGraph(graph.v,graph.e[0])
       outgoing_edges = list(graph.edges(source_vertex))
       outgoing_edges = [graph.e[0][i] for i in outgoing_edges]
       answer = self.get_disconnected_vertices(
@@ -609,7 +641,7 @@ class DisconnectedVertices(GraphTask):
   ):
     name_dict = hypergraph_text_encoder.NODE_ENCODER_DICT[encoding_method]
     question = hypergraph_text_encoder.encode_graph(graph, encoding_method)
-    source_vertex = random.sample(list(graph.v), k=1)[0]
+    source_vertex = self.rng.sample(list(graph.v), k=1)[0]
     task_description = f'Q: List all the vertices that are not connected to {name_dict[source_vertex]} in alphabetical order. List all the answers after "Ans" in the format of [{name_dict[0]},{name_dict[1]},{name_dict[2]}] and separate the answers by a comma.\nA: '
     question += task_description
     outgoing_edges = list(graph.edges(source_vertex))
@@ -655,7 +687,7 @@ class ReachabilityCheck(GraphTask):
     name_dict = hypergraph_text_encoder.NODE_ENCODER_DICT[encoding_method]
 
     for ind, graph in enumerate(graphs):
-      source, target = random.sample(list(graph.v), k=2)
+      source, target = self.rng.sample(list(graph.v), k=2)
       question = hypergraph_text_encoder.encode_graph(graph, encoding_method)
       task_description = 'Q: Is there a path from vertex %s to vertex %s? List the answers after "Ans:" in the format of [Yes, No,].\nA: ' % (
           name_dict[source],
@@ -682,7 +714,7 @@ class ReachabilityCheck(GraphTask):
       self, graph, encoding_method, cot
   ):
     name_dict = hypergraph_text_encoder.NODE_ENCODER_DICT[encoding_method]
-    source, target = random.sample(list(graph.v), k=2)
+    source, target = self.rng.sample(list(graph.v), k=2)
     question = hypergraph_text_encoder.encode_graph(graph, encoding_method)
     question += 'Q: Is there a path from vertex %s to vertex %s? List the answers after "Ans:" in the format of [Yes, No,].\nA: ' % (
         name_dict[source],
@@ -736,7 +768,7 @@ class ShortestPath(GraphTask):
     name_dict = hypergraph_text_encoder.NODE_ENCODER_DICT[encoding_method]
 
     for ind, graph in enumerate(graphs):
-      source, target = random.sample(list(graph.v), k=2)
+      source, target = self.rng.sample(list(graph.v), k=2)
       question = hypergraph_text_encoder.encode_graph(graph, encoding_method)
       task_description = (
           'Q: What is the length of the shortest path from vertex %s to vertex'
@@ -747,12 +779,10 @@ class ShortestPath(GraphTask):
           )
       )
       question += task_description
-      try:
-        path = graph.short_path(source, target)
-        if path is None:
-            raise nx.NetworkXNoPath
-        answer = str(len(path) - 1) + '.'
-      except nx.NetworkXNoPath:
+      distance = graph.distance(source, target)
+      if distance is not None:
+        answer = str(distance) + '.'
+      else:
         answer = 'There is no path from vertex %s to vertex %s.' % (
             name_dict[source],
             name_dict[target],
@@ -773,7 +803,7 @@ class ShortestPath(GraphTask):
       self, graph, encoding_method, cot
   ):
     name_dict = hypergraph_text_encoder.NODE_ENCODER_DICT[encoding_method]
-    source, target = random.sample(list(graph.v), k=2)
+    source, target = self.rng.sample(list(graph.v), k=2)
     question = hypergraph_text_encoder.encode_graph(graph, encoding_method)
     question += (
         'Q: What is the length of the shortest path from vertex %s to vertex'
@@ -813,8 +843,6 @@ class ShortestPath(GraphTask):
         )
     return question + answer
 
-import dhg
-
 
 class VertexSetConnectionCheck(GraphTask):
   """The hypergraph task to check if set A connected to set B"""
@@ -841,36 +869,36 @@ class VertexSetConnectionCheck(GraphTask):
 
     for ind, graph in enumerate(graphs):
       # produce postive instance 
-      p = random.random()
+      p = self.rng.random()
       hyperedges = graph.e[0]
       if p > 0.5 or len(hyperedges)<=1: 
         times = 0
         while True:
-          selected_edge = random.choice(hyperedges)
+          selected_edge = self.rng.choice(hyperedges)
           if len(selected_edge) == 2 and times < len(hyperedges): 
             times += 1
             continue 
           break
-        len_list1 = random.randint(1, len(selected_edge)-1)
-        list1 = random.sample(selected_edge, len_list1)
+        len_list1 = self.rng.randint(1, len(selected_edge)-1)
+        list1 = self.rng.sample(selected_edge, len_list1)
         list2 = [item for item in selected_edge if item not in list1]
         begin = 1 
         if len(list1) == 1 and len(selected_edge)>2: 
           begin = 2 
-        len_list2 = random.randint(begin, len(list2))
-        list2 = random.sample(list2, len_list2)
+        len_list2 = self.rng.randint(begin, len(list2))
+        list2 = self.rng.sample(list2, len_list2)
         answer = 'Yes.'
       else:
         while True:
-          edge1 , edge2 = random.sample(hyperedges,2)
+          edge1 , edge2 = self.rng.sample(hyperedges,2)
           common = list(set(edge1).intersection(set(edge2)))
-          len_list1 = random.randint(2, len(edge1))
-          list1 = random.sample(edge1, len_list1)
+          len_list1 = self.rng.randint(2, len(edge1))
+          list1 = self.rng.sample(edge1, len_list1)
           edge2 = [item for item in edge2 if item not in list1]
           if len(edge2) == 0 : 
             continue
-          len_list2 = random.randint(1, len(edge2))
-          list2 = random.sample(edge2, len_list2)
+          len_list2 = self.rng.randint(1, len(edge2))
+          list2 = self.rng.sample(edge2, len_list2)
           if set(list1).issubset(set(common)) and set(list2).issubset(set(common)):
             continue
           answer = 'No.'
@@ -904,37 +932,37 @@ class VertexSetConnectionCheck(GraphTask):
       self, graph, encoding_method, cot
   ):
     name_dict = hypergraph_text_encoder.NODE_ENCODER_DICT[encoding_method]
-    p = random.random()
+    p = self.rng.random()
     hyperedges = graph.e[0]
     if p > 0.5 or len(hyperedges)<=1: 
         # 
       times = 0
       while True:
-        selected_edge = random.choice(hyperedges)
+        selected_edge = self.rng.choice(hyperedges)
         if len(selected_edge) == 2 and times < len(hyperedges): 
           times += 1
           continue 
         break
-      len_list1 = random.randint(1, len(selected_edge)-1)
-      list1 = random.sample(selected_edge, len_list1)
+      len_list1 = self.rng.randint(1, len(selected_edge)-1)
+      list1 = self.rng.sample(selected_edge, len_list1)
       list2 = [item for item in selected_edge if item not in list1]
       begin = 1 
       if len(list1) == 1 and len(selected_edge)>2: 
         begin = 2 
-      len_list2 = random.randint(begin, len(list2))
-      list2 = random.sample(list2, len_list2)
+      len_list2 = self.rng.randint(begin, len(list2))
+      list2 = self.rng.sample(list2, len_list2)
       answer = 'Ans:[Yes,]'
     else:
       while True:
-        edge1 , edge2 = random.sample(hyperedges,2)
+        edge1 , edge2 = self.rng.sample(hyperedges,2)
         common = list(set(edge1).intersection(set(edge2)))
-        len_list1 = random.randint(2, len(edge1))
-        list1 = random.sample(edge1, len_list1)
+        len_list1 = self.rng.randint(2, len(edge1))
+        list1 = self.rng.sample(edge1, len_list1)
         edge2 = [item for item in edge2 if item not in list1]
         if len(edge2) == 0 : 
           continue
-        len_list2 = random.randint(1, len(edge2))
-        list2 = random.sample(edge2, len_list2)
+        len_list2 = self.rng.randint(1, len(edge2))
+        list2 = self.rng.sample(edge2, len_list2)
         if set(list1).issubset(set(common)) and set(list2).issubset(set(common)):
           continue
         answer = 'Ans:[No,]'
@@ -993,24 +1021,24 @@ class VertexSet_In_HyperedgeCheck(GraphTask):
     name_dict = hypergraph_text_encoder.NODE_ENCODER_DICT[encoding_method]
 
     for ind, graph in enumerate(graphs):
-      p = random.random()
+      p = self.rng.random()
       if p > 0.6:
         hyperedges = graph.e[0]
-        selected_edge = random.choice(hyperedges)
+        selected_edge = self.rng.choice(hyperedges)
         if len(selected_edge) >= 3: 
           min_len = 3 
         else:
           min_len = len(selected_edge)
-        len_set = random.randint(min_len, len(selected_edge))
-        vertex_set = random.sample(selected_edge, len_set)
+        len_set = self.rng.randint(min_len, len(selected_edge))
+        vertex_set = self.rng.sample(selected_edge, len_set)
       else:
         num_v = len(graph.v)
         deg_e_list = list(range(2, num_v + 1))
         prob_k_list = [3 ** (-k) for k in range(len(deg_e_list))]
         sum_of_prob_k_list = sum(prob_k_list)
         prob_k_list = [prob_k / sum_of_prob_k_list for prob_k in prob_k_list]
-        k = random.choices(deg_e_list, weights=prob_k_list)[0]
-        e = random.sample(range(num_v), k)
+        k = self.rng.choices(deg_e_list, weights=prob_k_list)[0]
+        e = self.rng.sample(range(num_v), k)
         e = tuple(sorted(e))
         vertex_set = e
       
@@ -1042,24 +1070,24 @@ class VertexSet_In_HyperedgeCheck(GraphTask):
       self, graph, encoding_method, cot
   ):
     name_dict = hypergraph_text_encoder.NODE_ENCODER_DICT[encoding_method]
-    p = random.random()
+    p = self.rng.random()
     if p > 0.6:
       hyperedges = graph.e[0]
-      selected_edge = random.choice(hyperedges)
+      selected_edge = self.rng.choice(hyperedges)
       if len(selected_edge) >= 3: 
         min_len = 3 
       else:
         min_len = len(selected_edge)
-      len_set = random.randint(min_len, len(selected_edge))
-      vertex_set = random.sample(selected_edge, len_set)
+      len_set = self.rng.randint(min_len, len(selected_edge))
+      vertex_set = self.rng.sample(selected_edge, len_set)
     else:
       num_v = len(graph.v)
       deg_e_list = list(range(2, num_v + 1))
       prob_k_list = [3 ** (-k) for k in range(len(deg_e_list))]
       sum_of_prob_k_list = sum(prob_k_list)
       prob_k_list = [prob_k / sum_of_prob_k_list for prob_k in prob_k_list]
-      k = random.choices(deg_e_list, weights=prob_k_list)[0]
-      e = random.sample(range(num_v), k)
+      k = self.rng.choices(deg_e_list, weights=prob_k_list)[0]
+      e = self.rng.sample(range(num_v), k)
       e = tuple(sorted(e))
       vertex_set = e
     question = hypergraph_text_encoder.encode_graph(graph, encoding_method)
@@ -1216,7 +1244,7 @@ class SharedVerticesBetweenHyperedges(GraphTask):
       question = hypergraph_text_encoder.encode_graph(graph, encoding_method)
       if len(graph.e[0]) < 2: 
         continue
-      source_edge , target_edge = random.sample(list(range(len(graph.e[0]))),k=2)
+      source_edge , target_edge = self.rng.sample(list(range(len(graph.e[0]))),k=2)
       task_description = f'Q: List the vertices connected to both hyperedge {self.get_edge_string(name_dict,edge_dict,graph,source_edge,encoding_method)} and hyperedge {self.get_edge_string(name_dict,edge_dict,graph,target_edge,encoding_method)} in alphabetical order. List all the answers after "Ans" in the format of [{name_dict[0]},{name_dict[1]},{name_dict[2]}] and separate the answers by a comma.\nA: '
       question += task_description
       source_edge_vertices = graph.e[0][source_edge]
@@ -1243,15 +1271,14 @@ class SharedVerticesBetweenHyperedges(GraphTask):
       self, graph, encoding_method, cot
   ):
     if len(graph.e[0]) < 2: 
-        number_of_vertices = random.choice(range(5,10))
-        number_of_hypedges = random.choice(range(2,int(number_of_vertices*1.5)))
-        graph = dhg.random.hypergraph_Gnm(num_v=int(number_of_vertices),num_e=number_of_hypedges)
-        graph = HyperGraph(graph.v,graph.e[0])
+        number_of_vertices = self.rng.choice(range(5,10))
+        number_of_hypedges = self.rng.choice(range(2,int(number_of_vertices*1.5)))
+        graph = self.random_hypergraph(number_of_vertices, number_of_hypedges)
       
     name_dict = hypergraph_text_encoder.NODE_ENCODER_DICT[encoding_method]
     edge_dict = hypergraph_text_encoder.EDGES_ENCODER_DICT[encoding_method]
     question = hypergraph_text_encoder.encode_graph(graph, encoding_method)
-    source_edge , target_edge = random.sample(list(range(len(graph.e[0]))),k=2)
+    source_edge , target_edge = self.rng.sample(list(range(len(graph.e[0]))),k=2)
     question += f'Q: List the vertices connected to both hyperedge {self.get_edge_string(name_dict,edge_dict,graph,source_edge,encoding_method)} and hyperedge {self.get_edge_string(name_dict,edge_dict,graph,target_edge,encoding_method)} in alphabetical order. List all the answers after "Ans" in the format of [{name_dict[0]},{name_dict[1]},{name_dict[2]}] and separate the answers by a comma.\nA: '
     source_edge_vertices = graph.e[0][source_edge]
     target_edge_vertices = graph.e[0][target_edge]
@@ -1291,6 +1318,10 @@ class IsomorphismRecognition(GraphTask):
     self.name = 'graph_isomorphism'
     self._task_description = 'Q: Are these two hypergraphs isomorphism? list the answers after "Ans" in the format of [Yes, No,].\nA: '
 
+  def prepare_unit(self, graphs):
+    # one vectorized WL pass over the graphs of the unit, the fingerprints stay cached on them across encoders
+    hypergraph_wl.wl_fingerprints(graphs)
+
   def prepare_examples_dict(
       self,
       graphs,
@@ -1298,45 +1329,22 @@ class IsomorphismRecognition(GraphTask):
       encoding_method,
   ):
     examples_dict = {}
+    # no-op for the graphs already fingerprinted by prepare_unit
+    self.prepare_unit(graphs)
     for ind, graph in enumerate(graphs):
 
-      if random.random() > 0.5:
+      if self.rng.random() > 0.5:
         # create Isomorphism
         graph_text1 = hypergraph_text_encoder.encode_graph(graph, encoding_method)
-        graph_shuf = graph.shuffleNode()
+        graph_shuf = graph.shuffleNode(rng=self.rng)
         graph_text2 = hypergraph_text_encoder.encode_graph(graph_shuf, encoding_method)
         answer = 'Yes.'
       else:
         # create non-Isomorphism
         graph_text1 = hypergraph_text_encoder.encode_graph(graph, encoding_method)
-        num_vertices = len(graph.v)
-        edge_degree = [len(e) for e in graph.e[0]]
-        num_e = len(edge_degree)
-        edges = set()
-        while len(edges) < num_e:
-            k = edge_degree[len(edges)]
-            e = random.sample(range(num_vertices), k)
-            e = tuple(sorted(e))
-            if e not in edges:
-                edges.add(e)
-        graph_shuf = HyperGraph(list(range(len(graph.v))),list(edges))
+        graph_shuf = self.get_non_isomorphic_graph(graph)
         graph_text2 = hypergraph_text_encoder.encode_graph(graph_shuf, encoding_method)
-        answer = 'No.'
-      
-      #  check 
-      from test_isomo import HGSCKernel
-      import matplotlib.pyplot as plt
-      model=HGSCKernel()
-      graph = dhg.Hypergraph(len(graph.v),graph.e[0])
-      graph_shuf = dhg.Hypergraph(len(graph_shuf.v),graph_shuf.e[0])
-      if model.test_isomo(graph,graph_shuf):
-        if answer == 'No.':
-          print("no is wrong")
-        answer = 'Yes.'
-      else:
-        if answer == 'Yes.':
-          print("yes is wrong")
-        answer = 'No.'
+        answer = 'Yes.' if graph_shuf.is_isomorphic(graph) else 'No.'
       graph_text1 = graph_text1.replace('G','H')
       question = "There are two hypergraphs: H and G.\nThe description of H is: " + graph_text1 + 'The description of G is: '+graph_text2 + self._task_description
       examples_dict[ind] = {
@@ -1356,33 +1364,18 @@ class IsomorphismRecognition(GraphTask):
   ):
     name_dict = hypergraph_text_encoder.NODE_ENCODER_DICT[encoding_method]
     edge_dict = hypergraph_text_encoder.EDGES_ENCODER_DICT[encoding_method]
-    if random.random() > 0.5:
+    if self.rng.random() > 0.5:
         # create Isomorphism
         graph_text1 = hypergraph_text_encoder.encode_graph(graph, encoding_method)
-        graph_shuf = graph.shuffleNode()
+        graph_shuf = graph.shuffleNode(rng=self.rng)
         graph_text2 = hypergraph_text_encoder.encode_graph(graph_shuf, encoding_method)
         answer = 'Yes.'
     else:
       # create non-Isomorphism
       graph_text1 = hypergraph_text_encoder.encode_graph(graph, encoding_method)
-      num_vertices = len(graph.v)
-      edge_degree = [len(e) for e in graph.e[0]]
-      num_e = len(edge_degree)
-      edges = set()
-      while len(edges) < num_e:
-          k = edge_degree[len(edges)]
-          e = random.sample(range(num_vertices), k)
-          e = tuple(sorted(e))
-          if e not in edges:
-              edges.add(e)
-      graph_shuf = HyperGraph(graph.v,list(edges))
+      graph_shuf = self.get_non_isomorphic_graph(graph)
       graph_text2 = hypergraph_text_encoder.encode_graph(graph_shuf, encoding_method)
-      from test_isomo import HGSCKernel
-      model=HGSCKernel()
-      if model.test_isomo(graph,graph_shuf):
-        answer = 'Yes.'
-      else:
-        answer = 'No.'
+      answer = 'Yes.' if graph_shuf.is_isomorphic(graph) else 'No.'
     graph_text1 = graph_text1.replace('G', 'H')
     question = "There are two hypergraphs: H and G.\nThe description of H is: " + graph_text1 + 'The description of G is: '+graph_text2 + self._task_description
     if cot:
@@ -1402,19 +1395,31 @@ class IsomorphismRecognition(GraphTask):
         )
     return question + answer
 
+  def get_non_isomorphic_graph(self, graph, max_tries=100):
+    """Draws random hyperedges with the same sizes as graph, again while the draw is isomorphic to graph."""
+    num_vertices = len(graph.v)
+    edge_degree = [len(e) for e in graph.e[0]]
+    num_e = len(edge_degree)
+    for _ in range(max_tries):
+      edges = set()
+      while len(edges) < num_e:
+          k = edge_degree[len(edges)]
+          e = self.rng.sample(range(num_vertices), k)
+          e = tuple(sorted(e))
+          if e not in edges:
+              edges.add(e)
+      graph_shuf = LiteHyperGraph(list(range(num_vertices)),list(edges))
+      if not graph_shuf.is_isomorphic(graph):
+        break
+    return graph_shuf
+
   def get_adj_matrix(self,hypergraph):
-    adj_matrix_str = '[,'
-    for edge in hypergraph.e[0]:
-      list = ['0'] * len(hypergraph.v)
-      for vertex in edge:
-        list[int(vertex)] = '1'
-      edge_str = '['
-      for i in list:
-        edge_str += (i + ',')
-      adj_matrix_str = adj_matrix_str[:-1] + edge_str[:-1] + '],'
-    adj_matrix_str = adj_matrix_str[:-1] + ']'
-    print(adj_matrix_str)
-    return adj_matrix_str
+    """Hyperedge x vertex 0/1 matrix of the hypergraph, e.g. [[1,1,0][0,1,1]]."""
+    incidence = hypergraph.incidence()
+    hyperedge_ids = np.repeat(np.arange(incidence.num_e), incidence.degree_e())
+    return _ISOMORPHISM_MATRIX_FORMAT.format(
+        incidence.num_e, len(hypergraph.v), hyperedge_ids, incidence.e_vertices
+    )
 
   def get_com_label(self, count):
     com_label = '{1,'
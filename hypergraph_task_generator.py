@@ -15,35 +15,19 @@
 r"""The graph tasks to be tried with LLMs."""
 from collections.abc import Sequence
 import os
-import random
 from absl import app
 from absl import flags
-import networkx as nx
-import numpy as np
-import pickle
+import hypergraph_fs
+import hypergraph_profile
 import hypergraph_task
+import hypergraph_task_writer
+import hypergraph_text_encoder
 import hypergraph_task_utils as utils
-import pandas as pd
-_TASK = flags.DEFINE_enum(
+_TASK = flags.DEFINE_list(
     'task',
     None,
-    [
-        'HyperedgeCount',
-        'VertexCount',
-        'VertexDegree',
-        'VertexConnectionCheck',
-        'ReachabilityCheck',
-        'ShortestPath',
-        'ConnectedVertices',
-        'DisconnectedVertices',
-        'HyperedgeDegree',
-        'VertexSetConnectionCheck',
-        'VertexSet_In_HyperedgeCheck',
-        'Hyperedge_In_HyperedgeCheck',
-        'SharedVerticesBetweenHyperedges',
-        'IsomorphismRecognition',
-    ],
-    'The task to generate datapoints.',
+    'Comma-separated tasks to generate datapoints for, or all. The graphs are'
+    ' loaded once and shared by every task of the run.',
     required=True,
 )
 _ALGORITHM = flags.DEFINE_enum(
@@ -65,6 +49,36 @@ _RANDOM_SEED = flags.DEFINE_integer(
     'The random seed to use for task generation.',
     required=True,
 )
+_ENCODING_CACHE_DIR = flags.DEFINE_string(
+    'encoding_cache_dir',
+    None,
+    'Directory keeping the text encodings of the graphs across runs.',
+)
+_ENCODING_CACHE_SIZE = flags.DEFINE_integer(
+    'encoding_cache_size',
+    16384,
+    'Number of graph encodings kept in memory (least recently used first out).',
+)
+_PROCESSES = flags.DEFINE_integer(
+    'processes',
+    1,
+    'Worker processes generating the examples, 0 for all cores. The examples'
+    ' do not depend on it.',
+)
+_OUTPUT_FORMATS = flags.DEFINE_list(
+    'output_formats',
+    ['jsonl', 'csv'],
+    'Comma-separated formats to write the examples in, among jsonl, parquet,'
+    ' csv and pkl. jsonl and parquet keep the graphs as references into'
+    ' graphs.jsonl of the task directory; pkl is the former whole-list pickle'
+    ' with the graphs inline.',
+)
+_ROW_GROUP_SIZE = flags.DEFINE_integer(
+    'row_group_size', 1024, 'Examples per row group of the parquet files.'
+)
+_PROFILE_STARTUP = flags.DEFINE_bool(
+    'profile_startup', False, 'Print the import time of every module this script loads.'
+)
 
 
 TASK_CLASS = {
@@ -83,6 +97,40 @@ TASK_CLASS = {
     'SharedVerticesBetweenHyperedges':hypergraph_task.SharedVerticesBetweenHyperedges,
     'IsomorphismRecognition':hypergraph_task.IsomorphismRecognition,
 }
+flags.register_validator(
+    'task',
+    lambda tasks: tasks == ['all'] or all(t in TASK_CLASS for t in tasks),
+    message='--task must be all or a comma-separated list of: ' + ','.join(TASK_CLASS),
+)
+flags.register_validator(
+    'output_formats',
+    lambda formats: all(f in ('jsonl', 'parquet', 'csv', 'pkl') for f in formats),
+    message='--output_formats must be a comma-separated list of: jsonl,parquet,csv,pkl',
+)
+
+
+_GRAPH_STORE = None
+
+
+def write_examples(examples, directory, file_name, csv_directory):
+  """Streams the examples to every format of --output_formats.
+
+  Args:
+    examples: iterable of the examples, consumed once.
+    directory: directory of the jsonl, parquet and pkl files.
+    file_name: file name without extension.
+    csv_directory: directory of the csv file.
+  """
+  paths = {}
+  for output_format in _OUTPUT_FORMATS.value:
+    if output_format == 'csv':
+      paths['csv'] = os.path.join(csv_directory, file_name + '.csv')
+    else:
+      paths[output_format] = os.path.join(directory, file_name + '.' + output_format)
+  with hypergraph_task_writer.ExampleWriter(
+      paths, _GRAPH_STORE, _ROW_GROUP_SIZE.value
+  ) as writer:
+    writer.write_all(examples)
 
 
 def zero_shot(
@@ -106,9 +154,9 @@ def zero_shot(
     random_seed: the random seed to use in the process.
     split: whether we are creating a train or test split.
   """
-  random.seed(random_seed)
-  zero_shot_examples = utils.create_zero_shot_task(
-      task, graphs, algorithms, text_encoders, cot=cot,prompt1=prompt1
+  zero_shot_examples = utils.iter_zero_shot_task(
+      task, graphs, algorithms, text_encoders, cot=cot,prompt1=prompt1,
+      random_seed=random_seed, processes=_PROCESSES.value or None,
   )
   if cot and not prompt1:
     file_name = task.name + '_zero_cot_'
@@ -118,17 +166,13 @@ def zero_shot(
     file_name = task.name + '_zero_shot_'
   else: 
     file_name = task.name + '_zero_cot_'
-  file_name += (prompt1 + split + '.pkl')
-  os.makedirs(os.path.join(_TASK_DIR.value, prompt1),exist_ok=True)
-  with open(os.path.join(_TASK_DIR.value, prompt1,file_name), 'wb') as f:
-    pickle.dump(zero_shot_examples, f)
-  zero_shot_examples = [{k:v for k,v in i.items() if k!='graph'} for i in zero_shot_examples]
-  df = pd.DataFrame(zero_shot_examples)
-  os.makedirs(os.path.join(_TASK_DIR.value, prompt1, "csv"),exist_ok=True)
-  df.to_csv(os.path.join(_TASK_DIR.value,prompt1,"csv",file_name.split('.')[0]+'.csv'),
-          columns=zero_shot_examples[0].keys(),
-          header=zero_shot_examples[0].keys(),
-          )
+  file_name += (prompt1 + split)
+  write_examples(
+      zero_shot_examples,
+      os.path.join(_TASK_DIR.value, prompt1),
+      file_name,
+      os.path.join(_TASK_DIR.value, prompt1, "csv"),
+  )
 
 def few_shot(
     task,
@@ -154,8 +198,7 @@ def few_shot(
     bag: whether to apply build-a-graph method or not.
     random_seed: the random seed to use in the process.
   """
-  random.seed(random_seed)
-  few_shot_examples = utils.create_few_shot_task(
+  few_shot_examples = utils.iter_few_shot_task(
       task,
       graphs,
       algorithms,
@@ -166,43 +209,46 @@ def few_shot(
       random_seed=random_seed,
       prompt1=prompt1,
       one_shot = one_shot,
+      processes=_PROCESSES.value or None,
   )
   file_name = task.name
   if not one_shot:
     if cot and bag:
-      file_name += f'_cot_bag_{prompt1}test.pkl'
+      file_name += f'_cot_bag_{prompt1}test'
     elif cot:
-      file_name += f'_cot_{prompt1}test.pkl'
+      file_name += f'_cot_{prompt1}test'
     elif bag:
-      file_name += f'_bag_{prompt1}test.pkl'
+      file_name += f'_bag_{prompt1}test'
     else:
-      file_name += f'_few_shot_{prompt1}test.pkl'
+      file_name += f'_few_shot_{prompt1}test'
   else:
-    file_name += f'_one_shot_{prompt1}test.pkl'
-  
-  os.makedirs(os.path.join(_TASK_DIR.value, prompt1),exist_ok=True)
-
-  with open(os.path.join(_TASK_DIR.value, prompt1,file_name), 'wb') as f:
-    pickle.dump(few_shot_examples, f)
+    file_name += f'_one_shot_{prompt1}test'
 
-  few_shot_examples = [{k:v for k,v in i.items() if k!='graph'} for i in few_shot_examples]
-  df = pd.DataFrame(few_shot_examples)
-  os.makedirs(os.path.join(_TASK_DIR.value, "csv",prompt1),exist_ok=True)
-  df.to_csv(os.path.join(_TASK_DIR.value, "csv",prompt1,file_name.split('.')[0]+'.csv'),
-          columns = few_shot_examples[0].keys(),
-          header = few_shot_examples[0].keys(),
-          )
+  write_examples(
+      few_shot_examples,
+      os.path.join(_TASK_DIR.value, prompt1),
+      file_name,
+      os.path.join(_TASK_DIR.value, "csv", prompt1),
+  )
 
 def main(argv):
+  global _GRAPH_STORE
   if len(argv) > 1:
     raise app.UsageError('Too many command-line arguments.')
+  if _PROFILE_STARTUP.value:
+    print(hypergraph_profile.startup_report('hypergraph_task_generator', os.path.dirname(os.path.abspath(__file__))))
 
   if _ALGORITHM.value == 'all':
     algorithms = ['er', 'ba', 'sbm', 'sfn', 'complete', 'star', 'path']
   else:
     algorithms = [_ALGORITHM.value]
   
-  os.makedirs(_TASK_DIR.value,exist_ok=True)
+  hypergraph_fs.makedirs(_TASK_DIR.value)
+  hypergraph_text_encoder.set_encoding_cache(
+      hypergraph_text_encoder.EncodingCache(
+          _ENCODING_CACHE_SIZE.value, _ENCODING_CACHE_DIR.value
+      )
+  )
   text_encoders = [
       # low-order 
       "N-Pair",
@@ -215,7 +261,8 @@ def main(argv):
       "HO-Neigh",
   ]
 
-  # Loading the graphs.
+  # Loading the graphs once for every task. Graphs read from a graphs.hgs store
+  # stay lazy: each one is decoded when a task first uses it.
   graphs = []
   generator_algorithms = []
   for algorithm in algorithms:
@@ -224,73 +271,95 @@ def main(argv):
         algorithm,
         'test',
     )
-    graphs += loaded_graphs
+    graphs = graphs + loaded_graphs
     generator_algorithms += [algorithm] * len(loaded_graphs)
-  # Defining a task on the graphs
-  task = TASK_CLASS[_TASK.value]()
-  # NOTE : zero_shot
-  zero_shot(
-      task,
-      graphs,
-      generator_algorithms,
-      text_encoders,
-      cot=False,
-      random_seed=_RANDOM_SEED.value,
-      split='test',
-  )
-  # NOTE : zero hyper-cot
-  zero_shot(
-      task,
-      graphs,
-      generator_algorithms,
-      text_encoders,
-      cot=True,
-      random_seed=_RANDOM_SEED.value,
-      split='test',
-  )
-
   # Loading few-shot graphs.
   few_shot_graphs = []
   for algorithm in algorithms:
-    few_shot_graphs += utils.load_hyper_graphs(
+    few_shot_graphs = few_shot_graphs + utils.load_hyper_graphs(
         _GRAPHS_DIR.value,
         algorithm,
         'train',
     )
-  # NOTE: few shot 
-  few_shot(
-      task,
-      graphs,
-      few_shot_graphs,
-      generator_algorithms,
-      text_encoders,
-      cot=False,
-      bag=False,
-      random_seed=_RANDOM_SEED.value,
-  )
-  # NOTE: cot
-  few_shot(
-      task,
-      graphs,
-      few_shot_graphs,
-      generator_algorithms,
-      text_encoders,
-      cot=True,
-      bag=False,
-      random_seed=_RANDOM_SEED.value,
-  )
-  # NOTE: cot hyper-bag
-  few_shot(
-      task,
-      graphs,
-      few_shot_graphs,
-      generator_algorithms,
-      text_encoders,
-      cot=True,
-      bag=True,
-      random_seed=_RANDOM_SEED.value,
-  )
 
+  cache = hypergraph_text_encoder.get_encoding_cache()
+  if (
+      _PROCESSES.value == 1
+      and cache is not None
+      and (len(graphs) + len(few_shot_graphs)) * len(text_encoders)
+      <= cache.max_entries
+  ):
+    # A serial run encodes every graph with all the encoders in one pass, so
+    # they share their intermediates; the tasks then read the texts from the
+    # cache. Pool workers keep encoding on their own.
+    for graph in list(graphs) + list(few_shot_graphs):
+      hypergraph_text_encoder.encode_graph_all(graph, text_encoders)
+
+  # Every graph referenced by the jsonl and parquet files, written once; the
+  # file is appended to, so earlier runs into task_dir keep their graphs.
+  _GRAPH_STORE = hypergraph_task_writer.GraphStore(
+      os.path.join(_TASK_DIR.value, 'graphs.jsonl')
+  )
+  task_names = list(TASK_CLASS) if _TASK.value == ['all'] else _TASK.value
+  for task_name in task_names:
+    # Every example draws from its own example_seed stream of the run seed, so
+    # each task gives the same files as a run on its own; the graphs keep their
+    # indexes and encodings across tasks.
+    task = TASK_CLASS[task_name]()
+    # NOTE : zero_shot
+    zero_shot(
+        task,
+        graphs,
+        generator_algorithms,
+        text_encoders,
+        cot=False,
+        random_seed=_RANDOM_SEED.value,
+        split='test',
+    )
+    # NOTE : zero hyper-cot
+    zero_shot(
+        task,
+        graphs,
+        generator_algorithms,
+        text_encoders,
+        cot=True,
+        random_seed=_RANDOM_SEED.value,
+        split='test',
+    )
+    # NOTE: few shot 
+    few_shot(
+        task,
+        graphs,
+        few_shot_graphs,
+        generator_algorithms,
+        text_encoders,
+        cot=False,
+        bag=False,
+        random_seed=_RANDOM_SEED.value,
+    )
+    # NOTE: cot
+    few_shot(
+        task,
+        graphs,
+        few_shot_graphs,
+        generator_algorithms,
+        text_encoders,
+        cot=True,
+        bag=False,
+        random_seed=_RANDOM_SEED.value,
+    )
+    # NOTE: cot hyper-bag
+    few_shot(
+        task,
+        graphs,
+        few_shot_graphs,
+        generator_algorithms,
+        text_encoders,
+        cot=True,
+        bag=True,
+        random_seed=_RANDOM_SEED.value,
+    )
+  _GRAPH_STORE.close()
 
 
 if __name__ == '__main__':
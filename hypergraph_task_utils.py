@@ -14,10 +14,14 @@
 # limitations under the License.
 
 """The graph tasks to be tried with LLMs."""
+import atexit
+import multiprocessing
 import os
 import random
-import networkx as nx
-from tensorflow.io import gfile
+import zlib
+import numpy as np
+import hypergraph_fs
+import hypergraph_text_encoder
 def create_example_feature(
     key,
     question,
@@ -63,12 +67,13 @@ def load_graphs(
       algorithm,
       split,
   )
+  import networkx as nx
   loaded_graphs = []
-  all_files = gfile.listdir(graphs_path)
+  all_files = hypergraph_fs.listdir(graphs_path)
   for file in all_files:
     if file.endswith('.graphml'):
       path = os.path.join(graphs_path, file)
-      graph = nx.read_graphml(open(path, 'rb'), node_type=int)
+      graph = nx.read_graphml(hypergraph_fs.open(path, 'rb'), node_type=int)
       if graph.number_of_vertices() <= max_nvertices:
         loaded_graphs.append(graph)
   return loaded_graphs
@@ -76,28 +81,49 @@ def load_graphs(
 
 
 import pickle
-from hyper_graph import HyperGraph
+from hyper_graph import LiteHyperGraph
+import hypergraph_store
 def load_hyper_graphs(
     base_path,
     algorithm,
     split,
     max_nvertices = 20,
+    stored_algorithm = None,
+    stored_split = None,
 ):
-  """Load a list of graphs from a given algorithm and split."""
+  """Load a list of graphs from a given algorithm and split.
+
+  The <algorithm>/<split> directory selects the graphs. A graphs.hgs store in
+  it is preferred to the {ind}.pkl files.
+
+  Args:
+    stored_algorithm: if given, only keep the store graphs tagged with this
+      generator algorithm (untagged graphs pass). The pkl files are untagged.
+    stored_split: the same for the split tag.
+  """
   graphs_path = os.path.join(
       base_path,
       algorithm,
       split,
   )
+  store_path = os.path.join(graphs_path, hypergraph_store.STORE_FILE_NAME)
+  if hypergraph_fs.exists(store_path):
+    # Filtered on the store index; a graph is only decoded when a task uses it.
+    return hypergraph_store.load_store_graphs(
+        store_path,
+        max_nvertices=max_nvertices,
+        algorithm=stored_algorithm,
+        split=stored_split,
+    )
   loaded_graphs = []
-  all_files = gfile.listdir(graphs_path)
+  all_files = hypergraph_fs.listdir(graphs_path)
   for file in all_files:
     if file.endswith('.pkl'):
       path = os.path.join(graphs_path, file)
-      with open(path,'rb') as f:
+      with hypergraph_fs.open(path,'rb') as f:
         graph = pickle.load(f)
       if len(graph.v) <= max_nvertices:
-        graph = HyperGraph(graph.v,graph.e[0])
+        graph = LiteHyperGraph(graph.v,graph.e[0])
         loaded_graphs.append(graph)
   return loaded_graphs
 
@@ -138,34 +164,183 @@ def prepare_examples(
   return examples
 
 
-def create_zero_shot_task(
+# Graphs per work unit. Every example is seeded on its own, so neither this nor
+# the number of processes changes the examples.
+_UNIT_SIZE = 64
+
+_PROMPT_SUFFIX = {
+    'v1': "Let's think step by step. Make sure the data is calculated and recorded accurately at each step.",
+    'v2': "Let's analyze the connectivity by considering hyperedges linked to vertices and vertices linked through hyperedges.",
+    'v3': "Let's think hyperedges connected by vertices then vertices connected by hyperedges.",
+}
+
+_POOLS = {}
+
+
+def _name_key(name):
+  return zlib.crc32(name.encode('utf-8'))
+
+
+def example_seed(random_seed, task_name, encoding_method, kind, graph_id):
+  """Seed of the random stream of one example.
+
+  The stream is spawned by np.random.SeedSequence from the run seed and
+  (task, encoder, kind of example, graph id), so an example does not depend on
+  which other examples are generated, in which order or in which process.
+
+  Args:
+    random_seed: the seed of the run (a non-negative integer).
+    task_name: task.name.
+    encoding_method: the text encoder.
+    kind: 'zero' for zero-shot examples, 'few' for few-shot questions and
+      'few_shots' for the solved examples shown in front of them.
+    graph_id: index of the graph in its list.
+
+  Returns:
+    A 128-bit integer for random.Random.seed.
+  """
+  sequence = np.random.SeedSequence(
+      random_seed,
+      spawn_key=(_name_key(task_name), _name_key(encoding_method),
+                 _name_key(kind), graph_id),
+  )
+  return int.from_bytes(sequence.generate_state(4).tobytes(), 'little')
+
+
+def _init_unit_worker(encoding_cache):
+  """Pool initializer: give the worker the same kind of encoding cache."""
+  if encoding_cache is not None:
+    hypergraph_text_encoder.set_encoding_cache(
+        hypergraph_text_encoder.EncodingCache(*encoding_cache)
+    )
+
+
+def _get_pool(processes):
+  """Worker pool shared by every task of the run, created on first use."""
+  if processes not in _POOLS:
+    cache = hypergraph_text_encoder.get_encoding_cache()
+    cache_config = None if cache is None else (cache.max_entries, cache.directory)
+    pool = multiprocessing.Pool(
+        processes, initializer=_init_unit_worker, initargs=(cache_config,)
+    )
+    atexit.register(pool.terminate)
+    _POOLS[processes] = pool
+  return _POOLS[processes]
+
+
+def _run_units(function, units, processes):
+  """Iterates over function(unit) for the units, computed here or in a pool, in order."""
+  if processes == 1 or len(units) <= 1:
+    return (function(unit) for unit in units)
+  return _get_pool(processes).imap(function, units, chunksize=1)
+
+
+def _examples_unit(unit):
+  """Examples of a chunk of graphs for one encoder, keyed by graph index.
+
+  The task first sees the whole chunk (GraphTask.prepare_unit), then each
+  example draws from its own stream (see example_seed). With few-shot
+  examples, each question is prefixed with k of them chosen from that stream.
+  """
+  (task, graphs, generator_algorithms, encoding_method, start, random_seed,
+   kind, few_shot_examples, k, bag) = unit
+  task.prepare_unit(graphs)
+  result = {}
+  for ind, graph in enumerate(graphs):
+    graph_id = start + ind
+    task.rng.seed(
+        example_seed(random_seed, task.name, encoding_method, kind, graph_id)
+    )
+    examples_dict = task.prepare_examples_dict(
+        [graph], generator_algorithms[ind:ind + 1], encoding_method
+    )
+    for value in examples_dict.values():
+      if few_shot_examples is not None:
+        few_shots_str = ''
+        for _ in range(k):
+          few_shots_str += 'Example: ' + task.rng.choice(few_shot_examples) + '\n'
+        value['question'] = few_shots_str + 'Example: ' + value['question']
+        if bag:
+          value['question'] = value['question'].replace(
+              '\nQ: ',
+              "\nLet's construct the hypergraph with the vertices and hyperedges first.\nQ: ",
+          )
+      result[graph_id] = value
+  return result
+
+
+def _few_shot_unit(unit):
+  """Few-shot example texts of a chunk of graphs for one encoder."""
+  task, graphs, encoding_method, start, random_seed, cot = unit
+  task.prepare_unit(graphs)
+  texts = []
+  for ind, graph in enumerate(graphs):
+    task.rng.seed(example_seed(
+        random_seed, task.name, encoding_method, 'few_shots', start + ind
+    ))
+    texts.append(task.create_few_shot_example(graph, encoding_method, cot))
+  return texts
+
+
+def iter_zero_shot_task(
     task,
     graphs,
     generator_algorithms,
     text_encoders,
     cot = False,
     prompt1='',
+    random_seed = None,
+    processes = 1,
 ):
-  """Create a recordio file with zero-shot examples for the task."""
-  examples = []
-  for encoding_method in text_encoders:
-    examples_dict = task.prepare_examples_dict(
-        graphs, generator_algorithms, encoding_method
-    )
+  """Yields the zero-shot examples of the task, as soon as each unit is done.
+
+  The work is split in (encoder, chunk of graphs) units for the processes.
+  Every example draws from its own stream seeded by example_seed, so the
+  examples are the same for any number of processes or order of the units.
+
+  Args:
+    random_seed: seed of the run, drawn from random if None.
+    processes: number of worker processes, None for all cores.
+  """
+  if random_seed is None:
+    random_seed = random.getrandbits(64)
+  units = [
+      (task, graphs[start:start + _UNIT_SIZE],
+       generator_algorithms[start:start + _UNIT_SIZE], encoding_method, start,
+       random_seed, 'zero', None, 0, False)
+      for encoding_method in text_encoders
+      for start in range(0, len(graphs), _UNIT_SIZE)
+  ]
+  results = _run_units(_examples_unit, units, processes)
+  for unit, examples_dict in zip(units, results):
+    encoding_method = unit[3]
     if cot:
       for key in examples_dict.keys():
         examples_dict[key]['question'] += "Let's think step by step. "
-    if prompt1 == 'v1':
-      for key in examples_dict.keys():
-        examples_dict[key]['question'] += "Let's think step by step. Make sure the data is calculated and recorded accurately at each step."
-    elif prompt1 == 'v2':
-      for key in examples_dict.keys():
-        examples_dict[key]['question'] += "Let's analyze the connectivity by considering hyperedges linked to vertices and vertices linked through hyperedges."
-    elif prompt1 == 'v3':
+    if prompt1 in _PROMPT_SUFFIX:
       for key in examples_dict.keys():
-        examples_dict[key]['question'] += "Let's think hyperedges connected by vertices then vertices connected by hyperedges."
-    examples += prepare_examples(examples_dict, encoding_method)
-  return examples
+        examples_dict[key]['question'] += _PROMPT_SUFFIX[prompt1]
+    yield from prepare_examples(examples_dict, encoding_method)
+
+
+def create_zero_shot_task(
+    task,
+    graphs,
+    generator_algorithms,
+    text_encoders,
+    cot = False,
+    prompt1='',
+    random_seed = None,
+    processes = 1,
+):
+  """Create a recordio file with zero-shot examples for the task.
+
+  The list of the examples of iter_zero_shot_task.
+  """
+  return list(iter_zero_shot_task(
+      task, graphs, generator_algorithms, text_encoders, cot=cot,
+      prompt1=prompt1, random_seed=random_seed, processes=processes,
+  ))
 
 import os 
 
@@ -175,33 +350,25 @@ def prepare_few_shots(
     graphs,
     text_encoders,
     cot,
+    random_seed = None,
+    processes = 1,
 ):
   """Create a dict of few-shot examples with their cot for the task."""
-  few_shots_examples_dict = {}
-  for encoding_method in text_encoders:
-    if encoding_method not in few_shots_examples_dict:
-      few_shots_examples_dict[(encoding_method)] = []
-    for graph in graphs:
-      few_shots_examples_dict[(encoding_method)].append(
-          task.create_few_shot_example(graph, encoding_method, cot)
-      )
+  if random_seed is None:
+    random_seed = random.getrandbits(64)
+  units = [
+      (task, graphs[start:start + _UNIT_SIZE], encoding_method, start,
+       random_seed, cot)
+      for encoding_method in text_encoders
+      for start in range(0, len(graphs), _UNIT_SIZE)
+  ]
+  few_shots_examples_dict = {encoding_method: [] for encoding_method in text_encoders}
+  for unit, texts in zip(units, _run_units(_few_shot_unit, units, processes)):
+    few_shots_examples_dict[unit[2]] += texts
   return few_shots_examples_dict
 
 
-def choose_few_shot_examples(
-    few_shots_dict,
-    encoding_method,
-    k = 2,
-):
-  """Choose few shot examples for each algorithm."""
-  few_shots_str = ''
-  for _ in range(k):
-    example_list = few_shots_dict[encoding_method]
-    few_shots_str += 'Example: ' + random.choice(example_list) + '\n'
-  return few_shots_str
-
-
-def create_few_shot_task(
+def iter_few_shot_task(
     task,
     graphs,
     generator_algorithms,
@@ -212,45 +379,53 @@ def create_few_shot_task(
     random_seed,
     prompt1='',
     one_shot = False,
+    processes = 1,
 ):
-  """Create a recordio file with few-shot examples for the task."""
-  number_of_tokens = {}
-  examples = []
-  print('prepare few shot task', 'cot', cot, 'bag', bag)
+  """Yields the few-shot examples of the task, as soon as each unit is done.
+
+  Like iter_zero_shot_task, every example and every few-shot example text
+  has its own stream (see example_seed) and does not depend on processes.
+  """
   few_shots_examples_dict = prepare_few_shots(
       task,
       few_shots_graphs,
       text_encoders,
       cot,
+      random_seed=random_seed,
+      processes=processes,
   )
-  for encoding_method in text_encoders:
-    random.seed(random_seed)
-    examples_dict = task.prepare_examples_dict(
-        graphs, generator_algorithms, encoding_method
-    )
-    for key in examples_dict.keys():
-      if not one_shot:
-        few_shots_examples = choose_few_shot_examples(
-            few_shots_examples_dict,
-            encoding_method,
-        )
-      else:
-        few_shots_examples = choose_few_shot_examples(
-            few_shots_examples_dict,
-            encoding_method,
-            k=1
-        )
-      examples_dict[key]['question'] = (
-          few_shots_examples + 'Example: ' + examples_dict[key]['question']
-      )
-      if bag:
-          examples_dict[key]['question'] = examples_dict[key]['question'].replace(
-              '\nQ: ',
-              "\nLet's construct the hypergraph with the vertices and hyperedges first.\nQ: ",
-          )
-      
-      if encoding_method not in number_of_tokens:
-        number_of_tokens[encoding_method] = []
-    examples += prepare_examples(examples_dict, encoding_method)
+  k = 1 if one_shot else 2
+  units = [
+      (task, graphs[start:start + _UNIT_SIZE],
+       generator_algorithms[start:start + _UNIT_SIZE], encoding_method, start,
+       random_seed, 'few', few_shots_examples_dict[encoding_method], k, bag)
+      for encoding_method in text_encoders
+      for start in range(0, len(graphs), _UNIT_SIZE)
+  ]
+  results = _run_units(_examples_unit, units, processes)
+  for unit, examples_dict in zip(units, results):
+    yield from prepare_examples(examples_dict, unit[3])
 
-  return examples
+
+def create_few_shot_task(
+    task,
+    graphs,
+    generator_algorithms,
+    few_shots_graphs,
+    text_encoders,
+    cot,
+    bag,
+    random_seed,
+    prompt1='',
+    one_shot = False,
+    processes = 1,
+):
+  """Create a recordio file with few-shot examples for the task.
+
+  The list of the examples of iter_few_shot_task.
+  """
+  return list(iter_few_shot_task(
+      task, graphs, generator_algorithms, few_shots_graphs, text_encoders,
+      cot, bag, random_seed, prompt1=prompt1, one_shot=one_shot,
+      processes=processes,
+  ))
@@ -0,0 +1,218 @@
+# coding=utf-8
+# Copyright 2024 The Google Research Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Streaming writers for the generated task examples."""
+
+import csv
+import io
+import json
+import os
+import pickle
+
+import hypergraph_fs
+import hypergraph_text_encoder
+
+
+class GraphStore:
+  """Graphs referenced by the examples, each written once as a JSONL line.
+
+  A graph is referenced by its content hash; its line is
+  {"ref": hash, "num_v": number of vertices, "edges": [[vertex, ...], ...]}.
+  An existing file is appended to, never rewritten: its refs are loaded first
+  and reused, so the files of earlier runs into the same directory keep
+  resolving.
+  """
+
+  def __init__(self, path):
+    self.path = path
+    hypergraph_fs.makedirs(os.path.dirname(path) or '.')
+    self._refs = set()
+    partial_line = False
+    if hypergraph_fs.exists(path):
+      with hypergraph_fs.open(path, 'rb') as f:
+        for line in f:
+          partial_line = not line.endswith(b'\n')
+          try:
+            self._refs.add(json.loads(line)['ref'])
+          except ValueError:
+            # The last line of an interrupted run, rewritten below if needed.
+            pass
+    self._file = hypergraph_fs.open(path, 'ab')
+    if partial_line:
+      self._file.write(b'\n')
+
+  def ref(self, graph):
+    """Returns the reference of the graph, writing the graph on first sight."""
+    ref = hypergraph_text_encoder.graph_content_hash(graph)
+    if ref not in self._refs:
+      self._refs.add(ref)
+      line = {'ref': ref, 'num_v': len(graph.v), 'edges': [list(e) for e in graph.e[0]]}
+      self._file.write((json.dumps(line) + '\n').encode('utf-8'))
+    return ref
+
+  def close(self):
+    self._file.close()
+
+
+def _graph_refs(graph, graph_store):
+  """The 'graph' field as a list of references (the isomorphism task has two graphs)."""
+  if graph is None:
+    return []
+  graphs = graph if isinstance(graph, (list, tuple)) else [graph]
+  return [graph_store.ref(g) for g in graphs]
+
+
+class _JsonlWriter:
+
+  def __init__(self, path, graph_store):
+    self._file = hypergraph_fs.open(path, 'wb')
+    self._graph_store = graph_store
+
+  def write(self, example):
+    row = dict(example, graph=_graph_refs(example.get('graph'), self._graph_store))
+    self._file.write((json.dumps(row, ensure_ascii=False) + '\n').encode('utf-8'))
+
+  def close(self):
+    self._file.close()
+
+
+class _CsvWriter:
+  """The same CSV as pandas.DataFrame.to_csv (index column first), without the graphs."""
+
+  def __init__(self, path):
+    self._file = hypergraph_fs.open(path, 'wb')
+    self._buffer = io.StringIO()
+    self._csv = csv.writer(self._buffer, lineterminator=os.linesep)
+    self._columns = None
+    self._index = 0
+
+  def _flush(self):
+    self._file.write(self._buffer.getvalue().encode('utf-8'))
+    self._buffer.seek(0)
+    self._buffer.truncate()
+
+  def write(self, example):
+    if self._columns is None:
+      self._columns = [k for k in example if k != 'graph']
+      self._csv.writerow([''] + self._columns)
+    self._csv.writerow([self._index] + [example.get(k) for k in self._columns])
+    self._index += 1
+    self._flush()
+
+  def close(self):
+    self._file.close()
+
+
+class _ParquetWriter:
+  """Parquet file written one row group of row_group_size examples at a time."""
+
+  def __init__(self, path, graph_store, row_group_size):
+    import pyarrow  # pylint: disable=g-import-not-at-top
+    import pyarrow.parquet  # pylint: disable=g-import-not-at-top
+    self._pa = pyarrow
+    self._path = path
+    self._graph_store = graph_store
+    self._row_group_size = row_group_size
+    self._rows = []
+    self._writer = None
+    self._file = None
+
+  def write(self, example):
+    row = {k: v for k, v in example.items() if k != 'graph'}
+    row['graph'] = _graph_refs(example.get('graph'), self._graph_store)
+    self._rows.append(row)
+    if len(self._rows) >= self._row_group_size:
+      self._flush()
+
+  def _flush(self):
+    if not self._rows:
+      return
+    schema = None if self._writer is None else self._writer.schema
+    table = self._pa.Table.from_pylist(self._rows, schema=schema)
+    if self._writer is None:
+      self._file = hypergraph_fs.open(self._path, 'wb')
+      self._writer = self._pa.parquet.ParquetWriter(self._file, table.schema)
+    self._writer.write_table(table)
+    self._rows = []
+
+  def close(self):
+    self._flush()
+    if self._writer is not None:
+      self._writer.close()
+      self._file.close()
+
+
+class _PickleWriter:
+  """The former output: the whole list of examples, live graphs included, pickled at close."""
+
+  def __init__(self, path):
+    self._path = path
+    self._examples = []
+
+  def write(self, example):
+    self._examples.append(example)
+
+  def close(self):
+    with hypergraph_fs.open(self._path, 'wb') as f:
+      pickle.dump(self._examples, f)
+
+
+class ExampleWriter:
+  """Writes each example to every requested format as soon as it is produced.
+
+  jsonl, csv and parquet are streamed; jsonl and parquet keep the graphs as
+  references into a GraphStore instead of the graphs themselves. pkl keeps
+  the former whole-list pickle.
+  """
+
+  def __init__(self, paths, graph_store=None, row_group_size=1024):
+    """Opens one writer per format.
+
+    Args:
+      paths: dict from format ('jsonl', 'csv', 'parquet' or 'pkl') to the path.
+      graph_store: GraphStore for the graph references of jsonl and parquet.
+      row_group_size: examples per Parquet row group.
+    """
+    self._writers = []
+    for output_format, path in paths.items():
+      hypergraph_fs.makedirs(os.path.dirname(path) or '.')
+      if output_format == 'jsonl':
+        self._writers.append(_JsonlWriter(path, graph_store))
+      elif output_format == 'csv':
+        self._writers.append(_CsvWriter(path))
+      elif output_format == 'parquet':
+        self._writers.append(_ParquetWriter(path, graph_store, row_group_size))
+      elif output_format == 'pkl':
+        self._writers.append(_PickleWriter(path))
+      else:
+        raise ValueError(f'Unknown output format {output_format}')
+
+  def write(self, example):
+    for writer in self._writers:
+      writer.write(example)
+
+  def write_all(self, examples):
+    for example in examples:
+      self.write(example)
+
+  def close(self):
+    for writer in self._writers:
+      writer.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
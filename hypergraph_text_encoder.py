@@ -15,222 +15,360 @@
 
 """Library for encoding graphs in text."""
 
+import collections
+import itertools
+import os
+
+import numpy as np
+
+import hypergraph_fs
 import name_dictionaries
-import networkx as nx 
+# Every encoder names vertices v0, v1, ... and hyperedges e0, e1, ...: they
+# share the two tables, so strings built from a table are shared too. The
+# tables grow on demand, for any number of vertices and hyperedges.
+_VERTEX_NAMES = name_dictionaries.name_table("integer", "v")
+_HYPEREDGE_NAMES = name_dictionaries.name_table("integer", "e")
 NODE_ENCODER_DICT = {
-    "N-Pair":{k:'v'+v for k,v in name_dictionaries.create_name_dict("integer").items()},
-    "LO-Inc":{k:'v'+v for k,v in name_dictionaries.create_name_dict("integer").items()},
-    "Adj-Mat":{k:'v'+v for k,v in name_dictionaries.create_name_dict("integer").items()},
-    "N-Set": {k:'v'+v for k,v in name_dictionaries.create_name_dict("integer").items()},
-    "HO-Inc":{k:'v'+v for k,v in name_dictionaries.create_name_dict("integer").items()},
-    "Inc-Mat": {k:'v'+v for k,v in name_dictionaries.create_name_dict("integer").items()},
-    "HO-Neigh":{k:'v'+v for k,v in name_dictionaries.create_name_dict("integer").items()},
+    "N-Pair":_VERTEX_NAMES,
+    "LO-Inc":_VERTEX_NAMES,
+    "Adj-Mat":_VERTEX_NAMES,
+    "N-Set": _VERTEX_NAMES,
+    "HO-Inc":_VERTEX_NAMES,
+    "Inc-Mat": _VERTEX_NAMES,
+    "HO-Neigh":_VERTEX_NAMES,
 }
 EDGES_ENCODER_DICT = {
-    "N-Pair":{k:'e'+v for k,v in name_dictionaries.create_name_dict("integer").items()},
-    "LO-Inc":{k:'e'+v for k,v in name_dictionaries.create_name_dict("integer").items()},
-    "Adj-Mat":{k:'e'+v for k,v in name_dictionaries.create_name_dict("integer").items()},
-    "N-Set": {k:'e'+v for k,v in name_dictionaries.create_name_dict("integer").items()},
-    "HO-Inc":{k:'e'+v for k,v in name_dictionaries.create_name_dict("integer").items()},
-    "Inc-Mat": {k:'e'+v for k,v in name_dictionaries.create_name_dict("integer").items()},
-    "HO-Neigh":{k:'e'+v for k,v in name_dictionaries.create_name_dict("integer").items()},
+    "N-Pair":_HYPEREDGE_NAMES,
+    "LO-Inc":_HYPEREDGE_NAMES,
+    "Adj-Mat":_HYPEREDGE_NAMES,
+    "N-Set": _HYPEREDGE_NAMES,
+    "HO-Inc":_HYPEREDGE_NAMES,
+    "Inc-Mat": _HYPEREDGE_NAMES,
+    "HO-Neigh":_HYPEREDGE_NAMES,
 }
 
 def create_vertex_string(name_dict, nvertices):
-  vertex_string = ""
-  for i in range(nvertices - 1):
-    vertex_string += name_dict[i] + ", "
-  vertex_string += "and " + name_dict[nvertices - 1]
-  return vertex_string
+  if isinstance(name_dict, name_dictionaries.NameTable) and nvertices > 0:
+    names = name_dict.first(nvertices - 1)
+  else:
+    names = [name_dict[i] for i in range(nvertices - 1)]
+  names.append("and " + name_dict[nvertices - 1])
+  return ", ".join(names)
 
 def create_hyperedge_string(nvertices,edge_dict):
-  vertex_string = ""
-  for i in range(nvertices - 1):
-    vertex_string += str(edge_dict[i]) + ", "
-  vertex_string += "and " + str(edge_dict[nvertices - 1])
-  return vertex_string
+  names = [str(edge_dict[i]) for i in range(nvertices - 1)]
+  names.append("and " + str(edge_dict[nvertices - 1]))
+  return ", ".join(names)
+
+
+def _names_list(name_dict, count):
+  """List of the names of the ids 0 .. count - 1."""
+  if isinstance(name_dict, name_dictionaries.NameTable):
+    return name_dict.first(count)
+  return [name_dict[i] for i in range(count)]
+
+
+class EncodingParts:
+  """Intermediates of a graph shared by its encoders, each built on first use.
+
+  encode_graph_all hands one instance to every encoder of a graph, so the
+  name lists, the incident hyperedges and the low-order neighbors of every
+  vertex and the positions of the ones of the matrices are computed once, not
+  once per encoder.
+  """
+
+  def __init__(self, graph):
+    self.graph = graph
+    self._strings = {}
+    self._incidence_pairs = None
+    self._low_pairs = None
+    self._vertex_edges = None
+    self._low_neighbors = None
+
+  def names(self, name_dict, count):
+    """List of the names of the ids 0 .. count - 1 in the table, built once per table."""
+    key = ('list', id(name_dict), count)
+    if key not in self._strings:
+      self._strings[key] = _names_list(name_dict, count)
+    return self._strings[key]
+
+  def names_string(self, name_dict, count):
+    """create_vertex_string(name_dict, count), computed once per name table."""
+    key = ('names', id(name_dict), count)
+    if key not in self._strings:
+      self._strings[key] = create_vertex_string(name_dict, count)
+    return self._strings[key]
+
+  def hyperedge_string(self, edge_dict):
+    """create_hyperedge_string of every hyperedge, computed once per name table."""
+    key = ('hyperedges', id(edge_dict))
+    if key not in self._strings:
+      self._strings[key] = create_hyperedge_string(len(self.graph.e[0]), edge_dict)
+    return self._strings[key]
+
+  def incidence_pairs(self):
+    """(vertex ids, hyperedge ids) of every vertex of every hyperedge, the ones of H."""
+    if self._incidence_pairs is None:
+      edges = self.graph.e[0]
+      sizes = np.fromiter(map(len, edges), dtype=np.int64, count=len(edges))
+      vertices = np.fromiter(
+          itertools.chain.from_iterable(edges), dtype=np.int64, count=int(sizes.sum())
+      )
+      self._incidence_pairs = vertices, np.repeat(np.arange(len(edges)), sizes)
+    return self._incidence_pairs
+
+  def low_pairs(self):
+    """(k, 2) array of the vertex pairs of the low-order clique expansion."""
+    if self._low_pairs is None:
+      _, edges = self.graph.clique_expanation_low()
+      self._low_pairs = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    return self._low_pairs
+
+  def vertex_edges(self):
+    """For every vertex, the increasing indices of the hyperedges containing it."""
+    if self._vertex_edges is None:
+      self._vertex_edges = [self.graph.edges(v) for v in range(len(self.graph.v))]
+    return self._vertex_edges
+
+  def low_neighbors(self):
+    """For every vertex, its sorted neighbors in the low-order clique expansion."""
+    if self._low_neighbors is None:
+      self._low_neighbors = [
+          self.graph.clique_neighbor_low(v) for v in range(len(self.graph.v))
+      ]
+    return self._low_neighbors
+
 
+# The encoders below collect the pieces of their text in a list and join it
+# once, so the text is copied a constant number of times whatever its length.
+# They take the shared intermediates of encode_graph_all as parts, and build
+# their own when called alone.
 
 
-def N_Set_encoder(graph, name_dict,edge_dcit):
-  output = (
+def N_Set_encoder(graph, name_dict,edge_dcit,parts=None):
+  parts = parts or EncodingParts(graph)
+  names = parts.names(name_dict, len(graph.v))
+  vertices_string = parts.names_string(name_dict, len(graph.v))
+  edges_string = parts.names_string(edge_dcit,len(graph.e[0]))
+  output = [
       "In an undirected hypergraph, (i, j, k) means that vertex i, vertex j and vertex k are"
-      " connected with an undirected hyperedge. "
-  )
-  vertices_string = create_vertex_string(name_dict, len(graph.v))
-  edges_string = create_vertex_string(edge_dcit,len(graph.e[0]))
-  output += "G describes a hypergraph among vertices %s " % vertices_string
-  output += "and among hyperedges %s.\n"% edges_string
+      " connected with an undirected hyperedge. ",
+      "G describes a hypergraph among vertices %s " % vertices_string,
+      "and among hyperedges %s.\n"% edges_string,
+  ]
   if graph.e[0]:
-    output += "The hyperedges in G are: "
+    output.append("The hyperedges in G are: ")
   for edge in graph.e[0]:
-    tmp = ''
-    for i in edge:
-      tmp += "%s," % (name_dict[i])
-    tmp = '(' + tmp[:-1] + '),'
-    output += tmp
-  return output.strip() + ".\n"
+    output.append('(' + ','.join([names[i] for i in edge]) + '),')
+  return "".join(output).strip() + ".\n"
 
 
 
-def HO_Inc_encoder(graph, name_dict,edge_dcit):
+def HO_Inc_encoder(graph, name_dict,edge_dcit,parts=None):
   "Encoding a hypergraph with its clique expanation graph with incident list."
+  parts = parts or EncodingParts(graph)
+  names = parts.names(name_dict, len(graph.v))
+  edge_names = parts.names(edge_dcit, len(graph.e[0]))
   num_v, edges = graph.clique_expanation()
-  vertices_string = create_vertex_string(name_dict, num_v)
-  edges_string = create_hyperedge_string(nvertices=len(graph.e[0]),edge_dict=edge_dcit)
-  output = "G describes a hypergraph among vertice %s and among hyperedges %s.\n" % (vertices_string ,edges_string )
+  vertices_string = parts.names_string(name_dict, num_v)
+  edges_string = parts.hyperedge_string(edge_dcit)
+  vertex_edges = parts.vertex_edges()
+  output = ["G describes a hypergraph among vertice %s and among hyperedges %s.\n" % (vertices_string ,edges_string )]
   if edges:
-    output += "In this hypergraph:\n"
-  
+    output.append("In this hypergraph:\n")
+
   for source_vertex in range(num_v):
-    neibor_edges = graph.edges(source_vertex)
-    output += "vertex %s is connected" % name_dict[source_vertex]
-    for e in neibor_edges:
-      target_vertices = []
-      edge = graph.e[0][e]
-      for vertex in edge:
-        if vertex != source_vertex:
-          target_vertices.append(vertex)
-      target_vertices_str = ""
-      nedges = 0
-      for target_vertex in target_vertices:
-        target_vertices_str += name_dict[target_vertex] + ", "
-        nedges += 1
-      if nedges > 1:
-        output += " to vertice %s with hyperedge %s," % (
-            target_vertices_str[:-2],
-            edge_dcit[e]
-        )
-      elif nedges == 1:
-        output += " to vertex %s with hyperedge %s," % (
-            target_vertices_str[:-2],
-            edge_dcit[e]
-        )
-    output = output[:-1] + ".\n"
-  return output
-
-
-def HO_Neigh_encoder(graph, name_dict,edge_dcit):
-  vertices_string = create_vertex_string(name_dict, len(graph.v))
-  edge_string = create_vertex_string(edge_dcit,len(graph.e[0]))
-  output = f"G describes a hypergraph among vertices {vertices_string} and hyperedges {edge_string}.\n"
+    line = ["vertex %s is connected" % names[source_vertex]]
+    for e in vertex_edges[source_vertex]:
+      target_vertices = [names[vertex] for vertex in graph.e[0][e] if vertex != source_vertex]
+      if len(target_vertices) > 1:
+        line.append(" to vertice %s with hyperedge %s," % (
+            ", ".join(target_vertices),
+            edge_names[e]
+        ))
+      elif len(target_vertices) == 1:
+        line.append(" to vertex %s with hyperedge %s," % (
+            target_vertices[0],
+            edge_names[e]
+        ))
+    # the last character goes: the trailing comma, or the "d" of a vertex without neighbors
+    output.append("".join(line)[:-1] + ".\n")
+  return "".join(output)
+
+
+def HO_Neigh_encoder(graph, name_dict,edge_dcit,parts=None):
+  parts = parts or EncodingParts(graph)
+  names = parts.names(name_dict, len(graph.v))
+  edge_names = parts.names(edge_dcit, len(graph.e[0]))
+  vertices_string = parts.names_string(name_dict, len(graph.v))
+  edge_string = parts.names_string(edge_dcit,len(graph.e[0]))
+  vertex_edges = parts.vertex_edges()
+  output = [f"G describes a hypergraph among vertices {vertices_string} and hyperedges {edge_string}.\n"]
   if graph.e[0]:
-    output += "In this hypergraph:\n"
+    output.append("In this hypergraph:\n")
 
   for source_vertex in graph.v:
-    tmp = []
-    for j,edge in enumerate(graph.e[0]):
-      if source_vertex in edge:
-        tmp.append(j)
-    if len(tmp) > 1: 
-      output += f"vertex {name_dict[source_vertex]} is connected to hyperedges "
-      for i in tmp:
-        output += f'{edge_dcit[i]},'
-      output = output[:-1] + '.\n'
-    elif len(tmp) == 1: 
-      output += f"vertex {name_dict[source_vertex]} is connected to hyperedges {edge_dcit[tmp[0]]}.\n"
-    else: 
-      pass       
+    tmp = vertex_edges[source_vertex]
+    if tmp:
+      output.append(f"vertex {names[source_vertex]} is connected to hyperedges ")
+      output.append(','.join([edge_names[i] for i in tmp]) + '.\n')
   for k,source_edge in enumerate(graph.e[0]):
-    output += f'Hyperedge {edge_dcit[k]} is connected to vertices '
-    for n in source_edge:
-      output += f'{name_dict[n]},'
-    output = output[:-1] + '.\n'
-  return output
+    output.append(f'Hyperedge {edge_names[k]} is connected to vertices ')
+    output.append(','.join([names[n] for n in source_edge]) + '.\n')
+  return "".join(output)
 
 
 
-def N_Pair_encoder(graph, name_dict,edge_dcit):
+def N_Pair_encoder(graph, name_dict,edge_dcit,parts=None):
   """Encoding a hypergraph with its clique expanation graph with Adjacency"""
+  parts = parts or EncodingParts(graph)
+  names = parts.names(name_dict, len(graph.v))
   num_v, edges = graph.clique_expanation_low()
-  vertices_string = create_vertex_string(name_dict, num_v)
-  edge_string = create_vertex_string(edge_dcit,len(graph.e[0]))
-  output = (
-        "In an undirected hypergraph, (i,j) means that vertex i and vertex j are"
-        " connected with an undirected hyperedge. "
-    )
-  output += f"G describes a hypergraph among vertices {vertices_string} and hyperedges {edge_string}.\n"
+  vertices_string = parts.names_string(name_dict, num_v)
+  edge_string = parts.names_string(edge_dcit,len(graph.e[0]))
+  output = [
+      "In an undirected hypergraph, (i,j) means that vertex i and vertex j are"
+      " connected with an undirected hyperedge. ",
+      f"G describes a hypergraph among vertices {vertices_string} and hyperedges {edge_string}.\n",
+  ]
   if edges:
-    output += "The connection relation between vertices in G are: "
-  for i, j in edges:
-    output += "(%s, %s) " % (name_dict[i], name_dict[j])
-  return output.strip() + ".\n"
+    output.append("The connection relation between vertices in G are: ")
+    output.extend([f"({names[i]}, {names[j]}) " for i, j in edges])
+  return "".join(output).strip() + ".\n"
 
 
-def LO_Inc_encoder(graph, name_dict,edge_dcit):
+def LO_Inc_encoder(graph, name_dict,edge_dcit,parts=None):
   "Encoding a hypergraph with its clique expanation graph with incident list."
+  parts = parts or EncodingParts(graph)
+  names = parts.names(name_dict, len(graph.v))
   num_v, edges = graph.clique_expanation_low()
-  vertices_string = create_vertex_string(name_dict, num_v)
-  edge_string = create_vertex_string(edge_dcit,len(graph.e[0]))
-  output = f"G describes a hypergraph among vertices {vertices_string} and hyperedges {edge_string}.\n"
+  vertices_string = parts.names_string(name_dict, num_v)
+  edge_string = parts.names_string(edge_dcit,len(graph.e[0]))
+  output = [f"G describes a hypergraph among vertices {vertices_string} and hyperedges {edge_string}.\n"]
   if edges:
-    output += "In this hypergraph:\n"
-  
+    output.append("In this hypergraph:\n")
+
+  low_neighbors = parts.low_neighbors()
   for source_vertex in range(num_v):
-    target_vertices = graph.clique_neighbor_low(source_vertex)
-    target_vertices_str = ""
-    nedges = 0
-    for target_vertex in target_vertices:
-      target_vertices_str += name_dict[target_vertex] + ", "
-      nedges += 1
-    if nedges > 1:
-      output += "vertex %s is connected to vertices %s.\n" % (
-          name_dict[source_vertex],
-          target_vertices_str[:-2],
-      )
-    elif nedges == 1:
-      output += "vertex %s is connected to vertex %s.\n" % (
-          name_dict[source_vertex],
-          target_vertices_str[:-2],
-      )
-  return output
+    target_vertices = [names[v] for v in low_neighbors[source_vertex]]
+    if len(target_vertices) > 1:
+      output.append("vertex %s is connected to vertices %s.\n" % (
+          names[source_vertex],
+          ", ".join(target_vertices),
+      ))
+    elif len(target_vertices) == 1:
+      output.append("vertex %s is connected to vertex %s.\n" % (
+          names[source_vertex],
+          target_vertices[0],
+      ))
+  return "".join(output)
+
+
+class BinaryMatrixFormat:
+  """Text layout of 0/1 matrices: "[" + rows + closing, each row "[0,1,...]".
+
+  The text is produced at byte level: per number of columns, a zero-row
+  template is built once; chunks of rows are tiled from it into a uint8
+  buffer and the ones are written at their offsets, so no Python code runs
+  per cell.
+  """
 
+  # Bytes formatted in one go, a bound on the temporary buffer.
+  chunk_bytes = 1 << 22
 
-def Inc_Mat_encoder(graph,name_dict,edge_dcit):
+  def __init__(self, row_separator, trailing_comma, closing):
+    """Fixes the layout.
+
+    Args:
+      row_separator: text between two rows.
+      trailing_comma: whether every cell, the last included, is followed by a
+        comma.
+      closing: text after the last row.
+    """
+    self.row_separator = row_separator
+    self.trailing_comma = trailing_comma
+    self.closing = closing
+    self._templates = {}
+
+  def _template(self, num_cols):
+    """Bytes of a zero row followed by the row separator; the digit of column j is at 1 + 2 * j."""
+    if num_cols not in self._templates:
+      cells = "0," * num_cols if self.trailing_comma else ",".join("0" * num_cols)
+      row = "[" + cells + "]" + self.row_separator
+      self._templates[num_cols] = np.frombuffer(row.encode(), dtype=np.uint8)
+    return self._templates[num_cols]
+
+  def format(self, num_rows, num_cols, rows, cols):
+    """Text of the num_rows x num_cols matrix with ones at (rows[k], cols[k])."""
+    template = self._template(num_cols)
+    width = len(template)
+    ones = np.sort(
+        np.asarray(rows, dtype=np.int64) * width + 1 + 2 * np.asarray(cols, dtype=np.int64)
+    )
+    chunk_rows = max(1, self.chunk_bytes // width)
+    output = ["["]
+    for start in range(0, num_rows, chunk_rows):
+      stop = min(start + chunk_rows, num_rows)
+      text = np.tile(template, stop - start)
+      lo, hi = np.searchsorted(ones, [start * width, stop * width])
+      text[ones[lo:hi] - start * width] = ord("1")
+      output.append(text.tobytes().decode())
+    if num_rows and self.row_separator:
+      output[-1] = output[-1][:-len(self.row_separator)]
+    output.append(self.closing)
+    return "".join(output)
+
+  def format_dense(self, matrix):
+    """Text of a 2-d array of zeros and ones."""
+    matrix = np.asarray(matrix)
+    rows, cols = np.nonzero(matrix)
+    return self.format(matrix.shape[0], matrix.shape[1], rows, cols)
+
+
+# The layout of the Inc-Mat and Adj-Mat encoders, one "[0,1,...,]" row per line.
+ENCODER_MATRIX_FORMAT = BinaryMatrixFormat(",\n", trailing_comma=True, closing="]\n")
+
+
+def format_binary_matrix(num_rows, num_cols, rows, cols):
+  """Text of the 0/1 matrix with ones at (rows[k], cols[k]) in the encoder layout."""
+  if num_rows == 0:
+    # the former row-by-row formatting dropped the opening bracket here
+    return "]\n"
+  return ENCODER_MATRIX_FORMAT.format(num_rows, num_cols, rows, cols)
+
+
+def Inc_Mat_encoder(graph,name_dict,edge_dcit,parts=None):
+  parts = parts or EncodingParts(graph)
   num_v, edges = len(graph.v) , graph.e[0]
-  vertices_string = create_vertex_string(name_dict, len(graph.v))
-  edge_string = create_vertex_string(edge_dcit,len(graph.e[0]))
-  output = f"G describes a hypergraph among vertices {vertices_string} and hyperedges {edge_string}.\n"
+  vertices_string = parts.names_string(name_dict, len(graph.v))
+  edge_string = parts.names_string(edge_dcit,len(graph.e[0]))
+  output = [f"G describes a hypergraph among vertices {vertices_string} and hyperedges {edge_string}.\n"]
   if edges:
-    output += "The incidence matrix of the hypergraph is\n"
-  def get_adj_matrix(hypergraph):
-    H = hypergraph.H.to_dense().int().numpy()
-    H_matrix_str = "["
-    for i in range(H.shape[0]):
-      tmp = "["
-      for j in range(H.shape[1]):
-        tmp += str(H[i,j])
-        tmp += ","
-      tmp += '],\n'
-      H_matrix_str += tmp 
-    H_matrix_str = H_matrix_str[:-2] + "]\n"
-    return H_matrix_str
-  output += get_adj_matrix(graph)
-  return output
-
-def Adj_Mat_encoder(graph,name_dict,edge_dcit):
+    output.append("The incidence matrix of the hypergraph is\n")
+  # H[v, e] = 1 for every vertex v of hyperedge e
+  vertex_ids, hyperedge_ids = parts.incidence_pairs()
+  output.append(format_binary_matrix(num_v, len(edges), vertex_ids, hyperedge_ids))
+  return "".join(output)
+
+def Adj_Mat_encoder(graph,name_dict,edge_dcit,parts=None):
+  parts = parts or EncodingParts(graph)
   num_v, edges = len(graph.v) , graph.e[0]
-  vertices_string = create_vertex_string(name_dict, len(graph.v))
-  edge_string = create_vertex_string(edge_dcit,len(graph.e[0]))
-  output = f"G describes a hypergraph among vertices {vertices_string} and among hyperedges {edge_string}.\n"
+  vertices_string = parts.names_string(name_dict, len(graph.v))
+  edge_string = parts.names_string(edge_dcit,len(graph.e[0]))
+  output = [f"G describes a hypergraph among vertices {vertices_string} and among hyperedges {edge_string}.\n"]
   if edges:
-    output += "The adjacency matrix between vertices of the hypergraph is\n"
-  def get_clique_adj_matrix(hypergraph):
-    H = hypergraph.H.to_dense().int()
-    H = H @ H.T
-    H = H.bool().int().numpy()
-    H_matrix_str = "["
-    for i in range(H.shape[0]):
-      tmp = "["
-      for j in range(H.shape[1]):
-        tmp += str(H[i,j])
-        tmp += ","
-      tmp += '],\n'
-      H_matrix_str += tmp 
-    H_matrix_str = H_matrix_str[:-2] + "]\n"
-    return H_matrix_str
-  output += get_clique_adj_matrix(graph)
-  return output
+    output.append("The adjacency matrix between vertices of the hypergraph is\n")
+  # (H @ H.T) > 0: the vertex pairs sharing a hyperedge, both ways, and the
+  # diagonal of every vertex in at least one hyperedge
+  pairs = parts.low_pairs()
+  covered = np.unique(parts.incidence_pairs()[0])
+  output.append(format_binary_matrix(
+      num_v,
+      num_v,
+      np.concatenate([pairs[:, 0], pairs[:, 1], covered]),
+      np.concatenate([pairs[:, 1], pairs[:, 0], covered]),
+  ))
+  return "".join(output)
   
 
 TEXT_ENCODER_FN = {
@@ -245,12 +383,128 @@ TEXT_ENCODER_FN = {
 
 
 def with_ids(graph, text_encoder):
+  import networkx as nx
   nx.set_node_attributes(graph, NODE_ENCODER_DICT[text_encoder], name="id")
   return graph
 
 
+class EncodingCache:
+  """Content-addressed cache of graph encodings.
+
+  Entries are keyed by (graph content hash, encoder name), so equal graphs
+  share their text whatever object they live in. The most recently used
+  max_entries texts are kept in memory; with a directory, every text is also
+  written there and read back on a memory miss, e.g. by a later run.
+  """
+
+  def __init__(self, max_entries=16384, directory=None):
+    self.max_entries = max_entries
+    self.directory = directory
+    self._entries = collections.OrderedDict()
+    self.hits = 0
+    self.misses = 0
+
+  def _path(self, key):
+    content, text_encoder = key
+    return os.path.join(self.directory, content[:2], f'{content}_{text_encoder}.txt')
+
+  def get(self, key):
+    """Returns the cached text for key, or None."""
+    text = self._entries.get(key)
+    if text is None and self.directory is not None:
+      path = self._path(key)
+      if hypergraph_fs.exists(path):
+        with hypergraph_fs.open(path, 'rb') as f:
+          text = f.read().decode('utf-8')
+        self._remember(key, text)
+    if text is None:
+      self.misses += 1
+      return None
+    self._entries.move_to_end(key)
+    self.hits += 1
+    return text
+
+  def put(self, key, text):
+    self._remember(key, text)
+    if self.directory is not None:
+      path = self._path(key)
+      hypergraph_fs.makedirs(os.path.dirname(path))
+      # written aside and renamed, so concurrent readers never see a partial file
+      partial = f'{path}.{os.getpid()}.tmp'
+      with hypergraph_fs.open(partial, 'wb') as f:
+        f.write(text.encode('utf-8'))
+      hypergraph_fs.rename(partial, path)
+
+  def _remember(self, key, text):
+    self._entries[key] = text
+    self._entries.move_to_end(key)
+    while len(self._entries) > self.max_entries:
+      self._entries.popitem(last=False)
+
+  def clear(self):
+    self._entries.clear()
+
+
+_ENCODING_CACHE = EncodingCache()
+
+
+def get_encoding_cache():
+  return _ENCODING_CACHE
+
+
+def set_encoding_cache(cache):
+  """Replaces the cache used by encode_graph, None disables caching."""
+  global _ENCODING_CACHE
+  _ENCODING_CACHE = cache
+
+
+def graph_content_hash(graph):
+  if hasattr(graph, 'content_hash'):
+    return graph.content_hash()
+  import hyper_graph
+  return hyper_graph.content_hash(len(graph.v), graph.e[0])
+
+
+def encode_graph_all(graph, text_encoders=None):
+  """Encodes a graph with several text encoders at once.
+
+  The encoders share one EncodingParts, so the intermediates common to them
+  are computed once for the graph; texts already in the EncodingCache are
+  taken from it.
+
+  Args:
+    graph: the graph to encode.
+    text_encoders: names of the encoders, all of TEXT_ENCODER_FN by default.
+
+  Returns:
+    dict from encoder name to text, in the order of text_encoders.
+  """
+  if text_encoders is None:
+    text_encoders = list(TEXT_ENCODER_FN)
+  cache = _ENCODING_CACHE
+  content = graph_content_hash(graph) if cache is not None else None
+  parts = None
+  texts = {}
+  for text_encoder in text_encoders:
+    text = cache.get((content, text_encoder)) if cache is not None else None
+    if text is None:
+      parts = parts or EncodingParts(graph)
+      text = TEXT_ENCODER_FN[text_encoder](
+          graph,
+          NODE_ENCODER_DICT[text_encoder],
+          EDGES_ENCODER_DICT[text_encoder],
+          parts,
+      )
+      if cache is not None:
+        cache.put((content, text_encoder), text)
+    texts[text_encoder] = text
+  return texts
+
+
 def encode_graph(graph, text_encoder):
-  """Encoding a graph according to the given text_encoder method."""
-  name_dict = NODE_ENCODER_DICT[text_encoder]
-  edge_dict = EDGES_ENCODER_DICT[text_encoder]
-  return TEXT_ENCODER_FN[text_encoder](graph, name_dict,edge_dict)
+  """Encoding a graph according to the given text_encoder method.
+
+  Every task and prompt mode gets the text from the shared EncodingCache, so a
+  graph is encoded once per encoder.
+  """
+  return encode_graph_all(graph, [text_encoder])[text_encoder]
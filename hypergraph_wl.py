@@ -0,0 +1,121 @@
+import hashlib
+import numpy as np
+
+from hypergraph_incidence import Incidence
+
+
+def _mix(x):
+    """
+    splitmix64 finalizer applied elementwise on uint64 arrays
+    """
+    with np.errstate(over='ignore'):
+        x = x + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+
+def _segment_sum(values, ptr):
+    """
+    Sums (mod 2**64) of values[ptr[i]:ptr[i+1]], 0 for empty segments
+    """
+    lengths = np.diff(ptr)
+    sums = np.zeros(len(lengths), dtype=np.uint64)
+    nonempty = lengths > 0
+    if nonempty.any():
+        sums[nonempty] = np.add.reduceat(values, ptr[:-1][nonempty])
+    return sums
+
+
+def _count_per_graph(graph_ids, colors, num_graphs):
+    """
+    Number of distinct colours inside every graph
+    """
+    order = np.lexsort((colors, graph_ids))
+    g, c = graph_ids[order], colors[order]
+    new = np.ones(len(g), dtype=bool)
+    new[1:] = (g[1:] != g[:-1]) | (c[1:] != c[:-1])
+    return np.bincount(g[new], minlength=num_graphs)
+
+
+def _structure(graph):
+    if isinstance(graph, Incidence):
+        return graph
+    if hasattr(graph, 'incidence'):
+        return graph.incidence()
+    return Incidence.from_edges(len(graph.v), graph.e[0])
+
+
+def wl_fingerprints(graphs, max_iterations=None):
+    """
+    Weisfeiler-Lehman colour refinement on the vertex-hyperedge incidence graphs of a whole list of hypergraphs,
+    run as one disjoint union in NumPy. Colours are 64-bit hashes (multisets hashed as wrapped sums), so they do
+    not depend on the other graphs of the batch. Each graph's fingerprint hashes its sorted vertex and hyperedge
+    colour histograms at the round where its own partition stops splitting.
+    Different fingerprints mean the hypergraphs are certainly not isomorphic; equal ones mean they may be.
+    Fingerprints are cached on HyperGraph objects (_wl_fingerprint) and only the missing ones are computed.
+    return: list of hex digests
+    """
+    result = [getattr(g, '_wl_fingerprint', None) for g in graphs]
+    todo = [i for i, f in enumerate(result) if f is None]
+    if not todo:
+        return result
+    structures = [_structure(graphs[i]) for i in todo]
+    num_graphs = len(structures)
+    num_v = np.array([s.num_v for s in structures], dtype=np.int64)
+    num_e = np.array([s.num_e for s in structures], dtype=np.int64)
+    v_offset = np.concatenate([[0], np.cumsum(num_v)])
+    e_offset = np.concatenate([[0], np.cumsum(num_e)])
+    nnz_offset = np.concatenate([[0], np.cumsum([len(s.e_vertices) for s in structures])])
+    # disjoint union in CSC order (grouped by hyperedge)
+    members = np.concatenate([s.e_vertices.astype(np.int64) + v_offset[k] for k, s in enumerate(structures)] or [np.zeros(0, np.int64)])
+    e_ptr = np.concatenate([s.e_ptr[:-1] + nnz_offset[k] for k, s in enumerate(structures)] + [[nnz_offset[-1]]]).astype(np.int64)
+    owners = np.repeat(np.arange(e_offset[-1]), np.diff(e_ptr))
+    # the same incidences grouped by vertex
+    by_vertex = np.argsort(members, kind='stable')
+    v_ptr = np.zeros(v_offset[-1] + 1, dtype=np.int64)
+    np.cumsum(np.bincount(members, minlength=v_offset[-1]), out=v_ptr[1:])
+    vertex_graph = np.repeat(np.arange(num_graphs), num_v)
+    edge_graph = np.repeat(np.arange(num_graphs), num_e)
+
+    v_colors = np.full(v_offset[-1], _mix(np.uint64(1)), dtype=np.uint64)
+    e_colors = np.full(e_offset[-1], _mix(np.uint64(2)), dtype=np.uint64)
+    counts = np.zeros(num_graphs, dtype=np.int64)
+    done = np.zeros(num_graphs, dtype=bool)
+    fingerprints = [None] * num_graphs
+    limit = max_iterations if max_iterations is not None else int(num_v.max(initial=0)) + 2
+    for _ in range(limit + 1):
+        with np.errstate(over='ignore'):
+            e_colors = _mix(e_colors * np.uint64(31) + _segment_sum(_mix(v_colors[members]), e_ptr))
+            v_colors = _mix(v_colors * np.uint64(37) + _segment_sum(_mix(e_colors[owners[by_vertex]]), v_ptr))
+        new_counts = _count_per_graph(vertex_graph, v_colors, num_graphs) + _count_per_graph(edge_graph, e_colors, num_graphs)
+        stable = (new_counts == counts) & ~done
+        for k in np.flatnonzero(stable | ((~done) & (_ == limit))).tolist():
+            vc = np.sort(v_colors[v_offset[k]:v_offset[k + 1]])
+            ec = np.sort(e_colors[e_offset[k]:e_offset[k + 1]])
+            fingerprints[k] = hashlib.sha1(vc.tobytes() + b'|' + ec.tobytes()).hexdigest()
+            done[k] = True
+        counts = new_counts
+        if done.all():
+            break
+    for k, i in enumerate(todo):
+        result[i] = fingerprints[k]
+        if hasattr(graphs[i], '_wl_fingerprint'):
+            graphs[i]._wl_fingerprint = fingerprints[k]
+    return result
+
+
+def batch_is_isomorphic(pairs):
+    """
+    Isomorphism labels for a list of (graph, graph) pairs: WL fingerprints of every graph are computed in one
+    batch and only the pairs that WL cannot separate go through the exact certificate comparison.
+    """
+    graphs = [g for pair in pairs for g in pair]
+    fingerprints = wl_fingerprints(graphs)
+    labels = []
+    for k, (a, b) in enumerate(pairs):
+        if fingerprints[2 * k] != fingerprints[2 * k + 1]:
+            labels.append(False)
+        else:
+            labels.append(a.certificate() == b.certificate())
+    return labels
@@ -15,6 +15,7 @@
 
 """Creates a dictionary mapping integers to vertex names."""
 
+import operator
 import random
 
 _RANDOM_SEED = 1234
@@ -45,3 +46,87 @@ def create_name_dict(name, nvertices = 20):
   for ind, value in enumerate(names_list):
     name_dict[ind] = value
   return name_dict
+
+
+# Schemes of NameTable: the name of an id, without the prefix.
+_NAME_SCHEMES = {
+    "integer": str,
+}
+
+
+class NameTable:
+  """Names of the ids 0, 1, 2, ... of a scheme, as prefix + name.
+
+  Indexed like the dict of create_name_dict, but unbounded: the names are
+  generated on first use, in blocks, into a list kept for O(1) lookups.
+  Nothing is generated at import time. Get tables from name_table, so that
+  every user of a scheme shares one. keys, values and items are bounded views
+  of the first ids, by default as many as the dicts of create_name_dict hold.
+  """
+
+  _BLOCK = 256
+  # Size of the dicts of create_name_dict, the default bound of the views.
+  _DICT_SIZE = len(_INTEGER_NAMES)
+
+  def __init__(self, scheme, prefix=""):
+    if scheme not in _NAME_SCHEMES:
+      raise ValueError(f"Unknown approach: {scheme}")
+    self.scheme = scheme
+    self.prefix = prefix
+    self._name = _NAME_SCHEMES[scheme]
+    self._names = []
+
+  def _grow(self, count):
+    """Generates the names up to id count - 1, at least doubling the table."""
+    start = len(self._names)
+    stop = max(count, 2 * start, self._BLOCK)
+    self._names.extend([self.prefix + self._name(i) for i in range(start, stop)])
+
+  def __getitem__(self, key):
+    key = operator.index(key)
+    if key < 0:
+      raise KeyError(key)
+    if key >= len(self._names):
+      self._grow(key + 1)
+    return self._names[key]
+
+  def __contains__(self, key):
+    try:
+      return operator.index(key) >= 0
+    except TypeError:
+      return False
+
+  def get(self, key, default=None):
+    return self[key] if key in self else default
+
+  def first(self, count):
+    """List of the names of the ids 0 .. count - 1."""
+    if count > len(self._names):
+      self._grow(count)
+    return self._names[:count]
+
+  def keys(self, count=_DICT_SIZE):
+    """The ids 0 .. count - 1."""
+    return range(count)
+
+  def values(self, count=_DICT_SIZE):
+    """List of the names of the ids 0 .. count - 1, as dict.values."""
+    return self.first(count)
+
+  def items(self, count=_DICT_SIZE):
+    """List of the (id, name) pairs of the ids 0 .. count - 1, as dict.items."""
+    return list(enumerate(self.first(count)))
+
+  def __reduce__(self):
+    return name_table, (self.scheme, self.prefix)
+
+
+_NAME_TABLES = {}
+
+
+def name_table(scheme, prefix=""):
+  """The NameTable of the scheme and prefix, one per process."""
+  key = (scheme, prefix)
+  if key not in _NAME_TABLES:
+    _NAME_TABLES[key] = NameTable(scheme, prefix)
+  return _NAME_TABLES[key]
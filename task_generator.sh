@@ -25,17 +25,16 @@ set -x
 GRAPHS_DIR="./hypergraphs/hypergraph"
 TASK_DIR="./hypergraphs/hypergraph/hyper_tasks"
 
-TASKS = ('HyperedgeCount' 'VertexCount' 'VertexDegree' 'VertexConnectionCheck' 'ReachabilityCheck' 'ShortestPath' 'ConnectedVertices' 'DisconnectedVertices' 'HyperedgeDegree' 'VertexSetConnectionCheck' 'VertexSet_In_HyperedgeCheck' 'Hyperedge_In_HyperedgeCheck' 'SharedVerticesBetweenHyperedges' 'IsomorphismRecognition')
+# Comma-separated task names, or all
+TASKS="all"
 ALGORITHM=""
 echo "The output path is set to: $TASK_DIR"
 
-for task in "${TASKS[@]}"
-do
-  echo "Generating examples for task $task"
-  python3 -m hypergraph_task_generator \
-                --task=$task \
-                --algorithm=$ALGORITHM \
-                --task_dir=$TASK_DIR \
-                --graphs_dir=$GRAPHS_DIR \
-                --random_seed=1234
-done
+# One process generates every task: the graphs are loaded and indexed only once.
+echo "Generating examples for tasks $TASKS"
+python3 -m hypergraph_task_generator \
+              --task=$TASKS \
+              --algorithm=$ALGORITHM \
+              --task_dir=$TASK_DIR \
+              --graphs_dir=$GRAPHS_DIR \
+              --random_seed=1234